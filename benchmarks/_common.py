@@ -0,0 +1,54 @@
+"""
+Helpers shared by benchmarks, that drive applications in process.
+"""
+from io import BytesIO
+
+
+def make_environ(path='/', method='GET', query='', body=b'', headers=None):
+    """
+    Makes minimal wsgi environment, like wsgi server would pass to application.
+    """
+    environ = {
+        'REQUEST_METHOD': method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'bench',
+        'SERVER_PORT': '8080',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'HTTP_HOST': 'localhost:8080',
+        'HTTP_USER_AGENT': 'bench client',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(body),
+    }
+
+    if body:
+        environ['CONTENT_LENGTH'] = str(len(body))
+
+    for name, value in (headers or {}).items():
+        key = name.upper().replace('-', '_')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = 'HTTP_' + key
+        environ[key] = value
+
+    return environ
+
+
+def start_response(status, headers, exc_info=None):
+    return None
+
+
+def consume(body):
+    """
+    Iterates response body and closes it, like wsgi server does.
+    """
+    size = 0
+    for chunk in body:
+        size += len(chunk)
+
+    close = getattr(body, 'close', None)
+    if close is not None:
+        close()
+
+    return size
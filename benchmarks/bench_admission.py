@@ -0,0 +1,86 @@
+"""
+Synthetic overload of application, that depends on backend with fixed capacity.
+
+Requests arrive at constant rate twice as high as backend can serve and are run by pool of
+server threads. Without admission control, requests queue up and latency grows for the whole run,
+with concurrency limit excess requests get 503 at once and latency of served ones stays bounded.
+
+Run from repository root::
+
+    python -m benchmarks.bench_admission
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from yawf import YAWF, Response
+from yawf.admission import AdmissionControl, ConcurrencyLimit
+from yawf.metrics import Histogram
+
+from ._common import consume, make_environ
+
+BACKEND_CAPACITY = 4
+BACKEND_LATENCY = 0.01
+OFFERED_RATE = 2 * BACKEND_CAPACITY / BACKEND_LATENCY
+DURATION = 3.0
+SERVER_THREADS = 64
+
+
+def make_app(admission=None) -> YAWF:
+    backend = threading.BoundedSemaphore(BACKEND_CAPACITY)
+
+    def query(request):
+        with backend:
+            time.sleep(BACKEND_LATENCY)
+        return Response('result')
+
+    app = YAWF(admission=admission)
+    app.router.add_get('/', query)
+    return app
+
+
+def measure(app) -> dict:
+    served, rejected = Histogram(), Histogram()
+    lock = threading.Lock()
+
+    def request(arrived):
+        statuses = []
+        consume(app(make_environ('/'), lambda status, headers, exc_info=None: statuses.append(status)))
+        latency = time.perf_counter() - arrived
+        with lock:
+            (served if statuses[0].startswith('200') else rejected).observe(latency)
+
+    # open loop: arrivals do not wait for responses, like independent clients
+    with ThreadPoolExecutor(SERVER_THREADS) as pool:
+        started = time.perf_counter()
+        for number in range(int(OFFERED_RATE * DURATION)):
+            arrival = started + number / OFFERED_RATE
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(request, arrival)
+
+    return {'served': served, 'rejected': rejected}
+
+
+def main():
+    cases = (
+        ('no admission', None),
+        ('fixed limit', AdmissionControl(limit=BACKEND_CAPACITY * 2)),
+        ('adaptive limit', AdmissionControl(limit=ConcurrencyLimit(SERVER_THREADS, adaptive=True, window=20))),
+    )
+
+    print('offered {:.0f} req/s, backend capacity {:.0f} req/s'.format(
+        OFFERED_RATE, BACKEND_CAPACITY / BACKEND_LATENCY))
+    print('{:>16} {:>8} {:>9} {:>10} {:>10} {:>14}'.format(
+        'case', 'served', 'rejected', 'p50, ms', 'p99, ms', 'reject p99, ms'))
+    for name, admission in cases:
+        result = measure(make_app(admission))
+        served, rejected = result['served'], result['rejected']
+        print('{:>16} {:>8} {:>9} {:>10.1f} {:>10.1f} {:>14.1f}'.format(
+            name, served.count, rejected.count, served.percentile(0.5) * 1000, served.percentile(0.99) * 1000,
+            rejected.percentile(0.99) * 1000))
+
+
+if __name__ == '__main__':
+    main()
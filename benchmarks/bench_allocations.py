@@ -0,0 +1,87 @@
+"""
+Measures memory allocated per request, that goes through ``YAWF.__call__``.
+
+Peak is the max of memory in use while request is processed. Retained is memory and number of objects
+still alive, when response body is given to server, i.e. what lives while response is written.
+
+Run from repository root::
+
+    python -m benchmarks.bench_allocations
+"""
+import gc
+import tracemalloc
+
+from yawf import YAWF, Response
+
+from ._common import consume, make_environ, start_response
+
+
+def index(request):
+    return Response('Hello World!!!')
+
+
+def item(request, id):
+    return Response({'id': id, 'page': request.args.get_int('page')})
+
+
+def cookie(request):
+    return Response('Hello {}'.format(request.cookies.get('user')))
+
+
+def make_app():
+    app = YAWF()
+    app.router.add_get('/', index)
+    app.router.add_get(r'/items/(?P<id>\d+)', item)
+    app.router.add_get('/cookie', cookie)
+    return app
+
+
+CASES = (
+    ('static text', lambda: make_environ('/')),
+    ('regex json', lambda: make_environ('/items/42', query='page=2')),
+    ('cookie', lambda: make_environ('/cookie', headers={'Cookie': 'user=me; token=secret'})),
+    ('not found', lambda: make_environ('/missing')),
+)
+
+
+def measure(app, make, number=200):
+    peaks, sizes, counts = [], [], []
+
+    for _ in range(number):
+        environ = make()
+        gc.collect()
+
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+
+        body = app(environ, start_response)
+
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        diff = tracemalloc.take_snapshot().compare_to(before, 'filename')
+        sizes.append(sum(stat.size_diff for stat in diff))
+        counts.append(sum(stat.count_diff for stat in diff))
+
+        consume(body)
+
+    middle = number // 2
+    return sorted(peaks)[middle], sorted(sizes)[middle], sorted(counts)[middle]
+
+
+def main():
+    app = make_app()
+    tracemalloc.start()
+
+    # warm up caches and lazily imported modules
+    for _, make in CASES:
+        consume(app(make(), start_response))
+
+    print('{:<12} {:>12} {:>16} {:>18}'.format('request', 'peak, bytes', 'retained, bytes', 'retained, objects'))
+    for name, make in CASES:
+        print('{:<12} {:>12} {:>16} {:>18}'.format(name, *measure(app, make)))
+
+    tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    main()
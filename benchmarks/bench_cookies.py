@@ -0,0 +1,66 @@
+"""
+Compares cookie parsing with former recursive implementation and measures requests with many cookies.
+Parser has to keep up with recursive splitter from 10 cookies up, while handling ``=`` and quotes in values.
+
+Run from repository root::
+
+    python -m benchmarks.bench_cookies
+"""
+import timeit
+
+from yawf import YAWF, Response
+from yawf.wrappers import Cookies
+
+from ._common import consume, make_environ, start_response
+
+
+class RecursiveCookies(dict):
+    """
+    Reference implementation, that splits cookie header recursively and fails on values with ``=``.
+    """
+
+    def __init__(self, env):
+        super().__init__()
+        self._init(env)
+
+    def _init(self, item):
+        if isinstance(item, dict) and 'HTTP_COOKIE' in item:
+            for i in item['HTTP_COOKIE'].split(';'):
+                self._init(i.strip())
+        elif isinstance(item, str):
+            key, val = item.split('=')
+            self[key] = val
+
+
+def make_header(count: int) -> str:
+    return '; '.join('cookie{}=value{}'.format(i, i) for i in range(count))
+
+
+def handler(request):
+    response = Response('Hello {}'.format(request.cookies.get('cookie0')))
+    response.set_cookie('seen', '1', max_age=3600, httponly=True)
+    return response
+
+
+def bench(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    app = YAWF()
+    app.router.add_get('/', handler)
+
+    print('{:>8} {:>16} {:>14} {:>16}'.format('cookies', 'recursive, us', 'parser, us', 'request, us'))
+    for count in (1, 10, 50, 200):
+        env = {'HTTP_COOKIE': make_header(count)}
+        number = max(1000, 200000 // count)
+
+        recursive = bench(lambda: RecursiveCookies(env), number)
+        parser = bench(lambda: Cookies(env['HTTP_COOKIE']), number)
+        request = bench(lambda: consume(app(make_environ('/', headers={'Cookie': env['HTTP_COOKIE']}),
+                                            start_response)), number)
+        print('{:>8} {:>16.2f} {:>14.2f} {:>16.2f}'.format(count, recursive, parser, request))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Measures peak memory of parsing multipart uploads of growing size.
+
+``Request.files`` streams file parts into temporary files, so its peak should stay flat,
+while reading whole body with ``Request.content`` grows with upload size.
+
+Run from repository root::
+
+    python -m benchmarks.bench_formparser
+"""
+import time
+import tracemalloc
+
+from yawf.wrappers import Request
+
+BOUNDARY = b'benchmarkboundary'
+MB = 1024 * 1024
+
+
+class UploadStream:
+    """
+    ``wsgi.input`` producing multipart body with one file part on the fly, so body is not kept in memory.
+    """
+
+    def __init__(self, size: int):
+        self.head = (b'--' + BOUNDARY + b'\r\nContent-Disposition: form-data; name="upload"; filename="a.bin"\r\n'
+                     b'Content-Type: application/octet-stream\r\n\r\n')
+        self.tail = b'\r\n--' + BOUNDARY + b'--\r\n'
+        self.size = size
+        self.length = len(self.head) + size + len(self.tail)
+        self.position = 0
+
+    def read(self, size: int) -> bytes:
+        start, end = self.position, min(self.position + size, self.length)
+        self.position = end
+
+        data = bytearray()
+        head, body_end = len(self.head), len(self.head) + self.size
+        if start < head:
+            data += self.head[start:min(end, head)]
+        if end > head and start < body_end:
+            data += b'x' * (min(end, body_end) - max(start, head))
+        if end > body_end:
+            data += self.tail[max(start, body_end) - body_end:end - body_end]
+        return bytes(data)
+
+
+def make_request(size: int) -> Request:
+    stream = UploadStream(size)
+    return Request({
+        'REQUEST_METHOD': 'POST',
+        'PATH_INFO': '/upload',
+        'CONTENT_TYPE': 'multipart/form-data; boundary=' + BOUNDARY.decode(),
+        'CONTENT_LENGTH': str(stream.length),
+        'wsgi.input': stream,
+    })
+
+
+def measure(size: int, read):
+    request = make_request(size)
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = read(request)
+    duration = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return peak, duration
+
+
+def main():
+    print('{:>10} {:>18} {:>14} {:>18} {:>14}'.format('upload', 'files peak, KB', 'files, MB/s',
+                                                     'content peak, KB', 'content, MB/s'))
+    for size in (1 * MB, 10 * MB, 50 * MB, 200 * MB):
+        files_peak, files_time = measure(size, lambda request: request.files)
+        content_peak, content_time = measure(size, lambda request: request.content)
+        print('{:>8}MB {:>18.0f} {:>14.0f} {:>18.0f} {:>14.0f}'.format(
+            size // MB, files_peak / 1024, size / MB / files_time, content_peak / 1024, size / MB / content_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Compares lookups in indexed Headers with former list scanning implementation.
+
+Run from repository root::
+
+    python -m benchmarks.bench_headers
+"""
+import timeit
+
+from yawf.wrappers import Headers
+
+
+class ListHeaders:
+    """
+    Reference implementation, that scans list of headers on every lookup.
+    """
+
+    def __init__(self, headers):
+        self._headers = [(key.replace('HTTP_', '').replace('_', '-'), subval.strip())
+                         for key, val in headers
+                         for subval in val.split(',')]
+
+    def __getitem__(self, item):
+        for name, val in self._headers:
+            if name.lower() == item.lower():
+                return val
+        raise KeyError
+
+    def get(self, item, default=None):
+        try:
+            return self[item]
+        except KeyError:
+            return default
+
+    def getall(self, item):
+        return [val for name, val in self._headers if name.lower() == item.lower()]
+
+    def __contains__(self, item):
+        try:
+            self[item]
+            return True
+        except KeyError:
+            return False
+
+
+def make_headers(count):
+    headers = [('X-Header-{}'.format(i), 'value {}'.format(i)) for i in range(count - 3)]
+    return headers + [('Content-Type', 'application/json'), ('Content-Length', '42'), ('Authorization', 'token')]
+
+
+def main():
+    print('{:>7} {:<28} {:>10} {:>11} {:>9}'.format('headers', 'operation', 'list, us', 'index, us', 'speedup'))
+
+    for count in (5, 15, 30):
+        raw = make_headers(count)
+        cases = (
+            ('get existing', lambda h: h.get('content-length')),
+            ('get missing', lambda h: h.get('x-missing')),
+            ('contains', lambda h: 'authorization' in h),
+            ('getall', lambda h: h.getall('content-type')),
+            ('3 reads per request', lambda h: (h.get('content-length'), h.get('content-type'),
+                                               h.get('authorization'))),
+        )
+
+        for name, operation in cases:
+            times = []
+            for headers in (ListHeaders(raw), Headers(raw)):
+                timer = timeit.Timer(lambda: operation(headers))
+                times.append(min(timer.repeat(repeat=5, number=20000)) / 20000 * 1e6)
+
+            print('{:>7} {:<28} {:>10.3f} {:>11.3f} {:>8.1f}x'.format(count, name, times[0], times[1],
+                                                                       times[0] / times[1]))
+
+        build = []
+        for cls in (ListHeaders, Headers):
+            timer = timeit.Timer(lambda: cls(raw))
+            build.append(min(timer.repeat(repeat=5, number=20000)) / 20000 * 1e6)
+        print('{:>7} {:<28} {:>10.3f} {:>11.3f} {:>8.1f}x'.format(count, 'build', build[0], build[1],
+                                                                   build[0] / build[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Compares json codecs on small, medium and large payloads.
+
+``json.dumps(...).encode()`` and ``json.loads(data.decode())`` are former serialization paths
+of Response and Request.json; orjson is measured only if it is installed.
+
+Run from repository root::
+
+    python -m benchmarks.bench_json
+"""
+import json
+import timeit
+
+from yawf.codec import JSONCodec
+
+
+class StdlibDefaults:
+    def dumps(self, obj):
+        return json.dumps(obj).encode()
+
+    def loads(self, data):
+        return json.loads(data.decode('utf-8'))
+
+
+def make_payloads():
+    item = {'id': 12345, 'name': 'some item', 'price': 12.5, 'tags': ['one', 'two'], 'active': True}
+    return (
+        ('small', {'status': 'ok', 'id': 42}),
+        ('medium', {'items': [dict(item, id=i) for i in range(50)]}),
+        ('large', {'items': [dict(item, id=i) for i in range(5000)]}),
+    )
+
+
+def codecs():
+    result = [('json.dumps().encode()', StdlibDefaults()), ('JSONCodec', JSONCodec())]
+    try:
+        from yawf.codec import OrjsonCodec
+        result.append(('OrjsonCodec', OrjsonCodec()))
+    except ImportError:  # pragma: no cover
+        pass
+    return result
+
+
+def bench(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    print('{:<8} {:<22} {:>12} {:>12} {:>10}'.format('payload', 'codec', 'dumps, us', 'loads, us', 'bytes'))
+
+    for name, payload in make_payloads():
+        data = json.dumps(payload).encode()
+        number = max(100, 2000000 // len(data))
+
+        for codec_name, codec in codecs():
+            dumps = bench(lambda: codec.dumps(payload), number)
+            loads = bench(lambda: codec.loads(data), number)
+            print('{:<8} {:<22} {:>12.2f} {:>12.2f} {:>10}'.format(name, codec_name, dumps, loads,
+                                                                  len(codec.dumps(payload))))
+
+
+if __name__ == '__main__':
+    main()
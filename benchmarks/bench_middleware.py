@@ -0,0 +1,54 @@
+"""
+Measures overhead of application wide middleware layers on request through ``YAWF.__call__``.
+
+Run from repository root::
+
+    python -m benchmarks.bench_middleware
+"""
+import timeit
+
+from yawf import YAWF, Response
+
+from ._common import consume, make_environ, start_response
+
+
+def index(request):
+    return Response('Hello World!!!')
+
+
+def passthrough(handler):
+    def wrapper(request, **kwargs):
+        return handler(request, **kwargs)
+    return wrapper
+
+
+def make_app(layers):
+    app = YAWF()
+    for _ in range(layers):
+        app.use(passthrough)
+    app.router.add_get('/', index)
+    app.freeze()
+    return app
+
+
+def bench(app, number=20000):
+    environ = make_environ('/')
+
+    def request():
+        consume(app(dict(environ), start_response))
+
+    return min(timeit.repeat(request, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    base = bench(make_app(0))
+    print('{:>6} {:>14} {:>20}'.format('layers', 'request, us', 'per layer, us'))
+    print('{:>6} {:>14.2f} {:>20}'.format(0, base, '-'))
+
+    for layers in (1, 2, 5, 10, 20):
+        time = bench(make_app(layers))
+        print('{:>6} {:>14.2f} {:>20.3f}'.format(layers, time, (time - base) / layers))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Compares route lookup of Router with plain linear regex scan.
+
+Run from repository root::
+
+    python -m benchmarks.bench_router
+"""
+import timeit
+
+from yawf.errors import NotFound, MethodNotAllowed
+from yawf.router import Route, Router
+
+
+class LinearRouter:
+    """
+    Reference implementation, that matches every route regex against path.
+    """
+
+    def __init__(self):
+        self._routes = {}
+
+    def add_route(self, method, path, handler):
+        self._routes[path, method] = Route(path=path, method=method, handler=handler)
+
+    def search_route(self, path, method):
+        routes = [route for route in self._routes.values() if route.match_path(path)]
+        if not routes:
+            raise NotFound(path)
+
+        routes = [route for route in routes if route.method == method]
+        if not routes:
+            raise MethodNotAllowed
+
+        route = routes[0]
+        return route.handler, route.get_url_args(path)
+
+
+def handler(request, **kwargs):  # pragma: no cover
+    return kwargs
+
+
+def fill(router, count):
+    for i in range(count // 2):
+        router.add_route('GET', '/static/{}/page'.format(i), handler)
+        router.add_route('GET', r'/users{}/(?P<id>\d+)/(?P<action>[a-z]+)'.format(i), handler)
+    return router
+
+
+def bench(router, path, number):
+    def lookup():
+        try:
+            router.search_route(path, 'GET')
+        except NotFound:
+            pass
+
+    return min(timeit.repeat(lookup, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    print('{:>6} {:<10} {:>12} {:>12} {:>9}'.format('routes', 'lookup', 'linear, us', 'router, us', 'speedup'))
+
+    for count in (10, 100, 1000):
+        linear, router = fill(LinearRouter(), count), fill(Router(), count)
+        last = count // 2 - 1
+        cases = (
+            ('static', '/static/{}/page'.format(last)),
+            ('regex', '/users{}/42/read'.format(last)),
+            ('missing', '/not/found'),
+        )
+        number = max(100000 // count, 100)
+
+        for name, path in cases:
+            linear_time = bench(linear, path, number)
+            router_time = bench(router, path, number)
+            print('{:>6} {:<10} {:>12.2f} {:>12.2f} {:>8.1f}x'
+                  .format(count, name, linear_time, router_time, linear_time / router_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Load test of ``yawf serve`` over localhost with growing number of workers.
+
+Handler does some cpu bound work, so throughput of single process is limited by GIL,
+and should grow with number of workers up to number of cores.
+
+Run from repository root::
+
+    python -m benchmarks.bench_serve
+"""
+import os
+import sys
+import time
+import socket
+import subprocess
+import http.client
+import multiprocessing
+
+from yawf import YAWF, Response
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DURATION = 3.0
+
+app = YAWF()
+
+
+def work(request):
+    payload = [{'id': i, 'name': 'item {}'.format(i), 'tags': ['a', 'b']} for i in range(200)]
+    return Response({'items': payload, 'total': sum(len(item['name']) for item in payload)})
+
+
+app.router.add_get('/', work)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError('Server did not start')
+
+
+def client(port: int, duration: float) -> int:
+    count = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        connection.request('GET', '/')
+        connection.getresponse().read()
+        connection.close()
+        count += 1
+    return count
+
+
+def measure(workers: int, clients: int, reuse_port: bool = False) -> float:
+    port = free_port()
+    command = [sys.executable, '-m', 'yawf', 'serve', 'benchmarks.bench_serve:app',
+               '--bind', '127.0.0.1:{}'.format(port), '--workers', str(workers), '--log-level', 'warning']
+    if reuse_port:
+        command.append('--reuse-port')
+
+    server = subprocess.Popen(command, cwd=ROOT)
+    try:
+        wait_ready(port)
+        with multiprocessing.Pool(clients) as pool:
+            counts = pool.starmap(client, [(port, DURATION)] * clients)
+        return sum(counts) / DURATION
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    clients = max(4, cores * 2)
+
+    print('{:>8} {:>12} {:>22}'.format('workers', 'req/s', 'req/s with reuse port'))
+    for workers in counts:
+        print('{:>8} {:>12.0f} {:>22.0f}'.format(workers, measure(workers, clients),
+                                                 measure(workers, clients, reuse_port=True)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Measures cold start: import time of yawf in new interpreter and time to get ready router,
+built with ``add_route`` or loaded from ``Router.snapshot``.
+
+Run from repository root::
+
+    python -m benchmarks.bench_startup
+"""
+import os
+import sys
+import time
+import subprocess
+
+from yawf.router import Router
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUTE_COUNTS = (100, 1000, 5000)
+RUNS = 10
+
+
+def handler(request, **kwargs):
+    return kwargs
+
+
+def import_time(module: str) -> float:
+    """
+    :return: the best cumulative import time of module in milliseconds
+    """
+    best = float('inf')
+    for _ in range(RUNS):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module], cwd=ROOT,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        for line in result.stderr.decode().splitlines():
+            parts = line.split('|')
+            if len(parts) == 3 and parts[2].strip() == module:
+                best = min(best, int(parts[1]) / 1000)
+    return best
+
+
+def build(count: int) -> Router:
+    router = Router()
+    for i in range(count):
+        if i % 2:
+            router.add_get('/static/{}/items'.format(i), handler, name='static{}'.format(i))
+        else:
+            router.add_get('/api/{}/<int:id>/<name>'.format(i), handler, name='template{}'.format(i))
+    return router
+
+
+def best_of(func) -> float:
+    best = float('inf')
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    print('import yawf: {:.1f} ms, http.client alone: {:.1f} ms'.format(import_time('yawf'),
+                                                                        import_time('http.client')))
+
+    print('{:>8} {:>12} {:>15} {:>12} {:>14}'.format('routes', 'build, ms', 'snapshot, ms', 'load, ms',
+                                                     'snapshot, KiB'))
+    for count in ROUTE_COUNTS:
+        router = build(count)
+        data = router.snapshot()
+        print('{:>8} {:>12.2f} {:>15.2f} {:>12.2f} {:>14.1f}'.format(
+            count, best_of(lambda: build(count)), best_of(router.snapshot),
+            best_of(lambda: Router.from_snapshot(data)), len(data) / 1024))
+
+
+if __name__ == '__main__':
+    main()
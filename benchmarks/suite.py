@@ -0,0 +1,252 @@
+"""
+Load profile of the whole wsgi request cycle, that drives ``YAWF.__call__`` in process.
+
+Every scenario is measured on applications with different number of routes and reports requests per
+second, p50/p99 latency and memory allocated per request. Results are written as json, so runs made
+before and after a change can be compared.
+
+Run from repository root::
+
+    python -m benchmarks.suite run --output before.json
+    python -m benchmarks.suite run --output after.json
+    python -m benchmarks.suite compare before.json after.json --threshold 0.1
+
+``compare`` exits with status 1, if requests per second or p50 latency of any case got worse
+by more than threshold.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import yawf
+from yawf import YAWF, Response
+
+from ._common import consume, make_environ, start_response
+
+ROUTE_COUNTS = (10, 100, 1000, 5000)
+LARGE_BODY = b'x' * (1024 * 1024)
+
+
+def index(request):
+    return Response('Hello World!!!')
+
+
+def item(request, id):
+    return Response({'id': id, 'page': request.args.get_int('page')})
+
+
+def echo_json(request):
+    return Response(request.json)
+
+
+def cookie(request):
+    return Response('Hello {}'.format(request.cookies.get('user')))
+
+
+def download(request):
+    # tuple body is sent as is, lists are serialized to json
+    return Response(response=(LARGE_BODY,), headers={
+        'Content-Type': 'application/octet-stream', 'Content-Length': str(len(LARGE_BODY)),
+    })
+
+
+def upload(request):
+    size = 0
+    for chunk in request.iter_content():
+        size += len(chunk)
+    return Response({'size': size})
+
+
+def filler(request, **kwargs):  # pragma: no cover
+    return Response('filler')
+
+
+def make_app(route_count: int) -> YAWF:
+    """
+    Makes application with ``route_count`` routes, half of them are static and half are templates.
+    Routes used by scenarios are registered last, so lookup passes all filler routes.
+    """
+    app = YAWF()
+    router = app.router
+
+    for i in range(route_count // 2):
+        router.add_get('/static/page{}'.format(i), filler, name='static{}'.format(i))
+        router.add_get('/api/res{}/<int:id>'.format(i), filler, name='param{}'.format(i))
+
+    router.add_get('/', index)
+    router.add_get('/items/<int:id>', item)
+    router.add_post('/json', echo_json)
+    router.add_get('/cookie', cookie)
+    router.add_get('/download', download)
+    router.add_post('/upload', upload)
+    return app
+
+
+JSON_BODY = json.dumps({'items': [{'id': i, 'name': 'item {}'.format(i), 'tags': ['a', 'b']} for i in range(20)]})
+
+SCENARIOS = {
+    'static': lambda: make_environ('/'),
+    'param': lambda: make_environ('/items/42', query='page=2'),
+    'not_found': lambda: make_environ('/missing/page'),
+    'json': lambda: make_environ('/json', method='POST', body=JSON_BODY.encode(),
+                                 headers={'Content-Type': 'application/json'}),
+    'cookies': lambda: make_environ('/cookie', headers={'Cookie': 'user=me; token=secret; theme=dark; lang=en'}),
+    'large_response': lambda: make_environ('/download'),
+    'large_request': lambda: make_environ('/upload', method='POST', body=LARGE_BODY,
+                                          headers={'Content-Type': 'application/octet-stream'}),
+}
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure_time(app, make, number: int):
+    """
+    :return: tuple of requests per second, p50 and p99 latency in microseconds
+    """
+    latencies = []
+    environs = [make() for _ in range(number)]
+    timer = time.perf_counter
+
+    gc.collect()
+    started = timer()
+    for environ in environs:
+        begin = timer()
+        consume(app(environ, start_response))
+        latencies.append(timer() - begin)
+    total = timer() - started
+
+    return number / total, percentile(latencies, 0.5) * 1e6, percentile(latencies, 0.99) * 1e6
+
+
+def measure_allocations(app, make, number: int) -> int:
+    """
+    :return: median of memory allocated while one request is processed, in bytes
+    """
+    peaks = []
+    for _ in range(number):
+        environ = make()
+        # tracing starts afresh for every request, as tracemalloc.reset_peak is there since python 3.9 only
+        tracemalloc.start()
+        try:
+            consume(app(environ, start_response))
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    return percentile(peaks, 0.5)
+
+
+def run(route_counts, scenarios, number: int, alloc_number: int):
+    results = []
+    for route_count in route_counts:
+        app = make_app(route_count)
+        for name in scenarios:
+            make = SCENARIOS[name]
+            # large bodies are slow enough to make fewer requests
+            count = max(50, number // 20) if name.startswith('large') else number
+
+            # warm up caches and lazily imported modules
+            for _ in range(10):
+                consume(app(make(), start_response))
+
+            rps, p50, p99 = measure_time(app, make, count)
+            results.append({
+                'scenario': name,
+                'routes': route_count,
+                'requests': count,
+                'rps': round(rps, 1),
+                'p50_us': round(p50, 2),
+                'p99_us': round(p99, 2),
+                'alloc_bytes': measure_allocations(app, make, alloc_number),
+            })
+            print('{:<16} {:>6} {:>12.1f} {:>10.2f} {:>10.2f} {:>12}'.format(
+                name, route_count, rps, p50, p99, results[-1]['alloc_bytes']))
+
+    return {
+        'meta': {
+            'yawf': yawf.__version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'results': results,
+    }
+
+
+def compare(before: dict, after: dict, threshold: float):
+    """
+    :return: list of ``(scenario, routes, metric, before, after)`` tuples, that got worse more than threshold
+    """
+    regressions = []
+    previous = {(result['scenario'], result['routes']): result for result in before['results']}
+
+    print('{:<16} {:>6} {:>12} {:>12} {:>9}'.format('scenario', 'routes', 'rps before', 'rps after', 'change'))
+    for result in after['results']:
+        key = result['scenario'], result['routes']
+        old = previous.get(key)
+        if old is None:
+            continue
+
+        change = result['rps'] / old['rps'] - 1
+        print('{:<16} {:>6} {:>12.1f} {:>12.1f} {:>+8.1%}'.format(key[0], key[1], old['rps'], result['rps'], change))
+
+        if result['rps'] < old['rps'] * (1 - threshold):
+            regressions.append(key + ('rps', old['rps'], result['rps']))
+        if result['p50_us'] > old['p50_us'] * (1 + threshold):
+            regressions.append(key + ('p50_us', old['p50_us'], result['p50_us']))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n', 1)[0].strip())
+    commands = parser.add_subparsers(dest='command')
+
+    run_parser = commands.add_parser('run', help='measure scenarios and write results')
+    run_parser.add_argument('--routes', type=int, nargs='+', default=ROUTE_COUNTS)
+    run_parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    run_parser.add_argument('--number', type=int, default=5000, help='requests per scenario')
+    run_parser.add_argument('--alloc-number', type=int, default=200, help='requests traced for allocations')
+    run_parser.add_argument('--output', help='json file to write results to')
+
+    compare_parser = commands.add_parser('compare', help='compare two results files')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help='allowed relative slowdown')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        print('{:<16} {:>6} {:>12} {:>10} {:>10} {:>12}'.format(
+            'scenario', 'routes', 'req/s', 'p50, us', 'p99, us', 'alloc, bytes'))
+        results = run(args.routes, args.scenarios, args.number, args.alloc_number)
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(results, file, indent=2)
+        return 0
+
+    if args.command == 'compare':
+        with open(args.before) as file:
+            before = json.load(file)
+        with open(args.after) as file:
+            after = json.load(file)
+
+        regressions = compare(before, after, args.threshold)
+        for scenario, routes, metric, old, new in regressions:
+            print('Regression: {} with {} routes, {} {} -> {}'.format(scenario, routes, metric, old, new))
+        return 1 if regressions else 0
+
+    parser.print_help()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
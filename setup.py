@@ -41,4 +41,8 @@ setup(
     tests_require=TEST_REQUIREMENTS,
 
     packages=find_packages(),
+
+    entry_points={
+        'console_scripts': ['yawf = yawf.serve:main'],
+    },
 )
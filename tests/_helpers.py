@@ -0,0 +1,90 @@
+"""
+Helpers shared by tests, that drive wsgi and asgi applications like server would do.
+"""
+import asyncio
+
+
+class StartResponse:
+    """
+    Keeps status and headers given by application, ``headers`` as dict and ``header_list`` as they were given.
+    """
+
+    def __call__(self, status, headers, exc_info=None):
+        self.status = status
+        self.header_list = headers
+        self.headers = dict(headers)
+
+
+def start(app, path='/', method='GET', query='', environ=None, **headers):
+    """
+    Calls wsgi application, response or error, leaving body iterable open.
+
+    :param environ: extra variables of wsgi environment
+    :param headers: request headers with lowercase names and ``_`` in place of ``-``
+    :return: tuple of start_response and body iterable
+    """
+    env = {'REQUEST_METHOD': method, 'PATH_INFO': path, 'QUERY_STRING': query}
+    if environ:
+        env.update(environ)
+    for name, value in headers.items():
+        env['HTTP_' + name.upper()] = value
+
+    start_response = StartResponse()
+    return start_response, app(env, start_response)
+
+
+def call(app, path='/', method='GET', query='', environ=None, **headers):
+    """
+    Like ``start``, but reads and closes body.
+
+    :return: tuple of start_response and body bytes
+    """
+    start_response, body = start(app, path, method, query, environ, **headers)
+    try:
+        return start_response, b''.join(body)
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def fake_server(app, method, path, chunks=(), headers=()):
+    """
+    Drives asgi application in process, like server would do for single http request.
+    """
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'path': path,
+        'query_string': b'',
+        'headers': [(name.encode(), value.encode()) for name, value in headers],
+        'client': ('127.0.0.1', 29899),
+        'server': ('localhost', 8080),
+    }
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': True} for chunk in chunks]
+    messages.append({'type': 'http.request', 'body': b'', 'more_body': False})
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+
+    response_start, body = sent[0], sent[1:]
+    assert response_start['type'] == 'http.response.start'
+    assert body[-1] == {'type': 'http.response.body', 'body': b'', 'more_body': False}
+
+    body = b''.join(message['body'] for message in body)
+    return response_start['status'], dict(response_start['headers']), body
@@ -0,0 +1,149 @@
+import threading
+
+import pytest
+
+from yawf import YAWF, AsyncYAWF, Response, StreamingResponse
+from yawf.admission import AdmissionControl, ConcurrencyLimit, RateLimiter
+
+from ._helpers import call, fake_server, run, start
+
+
+def test_concurrency_limit():
+    limit = ConcurrencyLimit(2)
+    assert limit.acquire() and limit.acquire()
+    assert not limit.acquire()
+
+    limit.release()
+    assert not limit.acquire(share=0.5)
+    assert limit.acquire()
+    assert limit.stats() == {'limit': 2, 'inflight': 2, 'rejected': 2}
+
+
+def test_adaptive_limit():
+    limit = ConcurrencyLimit(10, adaptive=True, min_limit=2, window=10, relearn=5)
+
+    def load(latency):
+        for _ in range(limit.window):
+            limit.acquire()
+            limit.release(latency)
+
+    load(0.01)
+    load(0.1)
+    assert limit.limit == 9
+
+    # lowest latency is relearned for slower workload, so limit stops going down
+    for _ in range(10):
+        load(0.1)
+    assert int(limit.limit) == 6
+
+    for power in range(30):
+        load(0.1 * 2 ** power)
+    assert limit.limit == 2
+
+    # saturated limit grows while latency is low
+    limit._min_latency = 0.1
+    for _ in range(3):
+        acquired = 0
+        while limit.acquire():
+            acquired += 1
+        for _ in range(acquired):
+            limit.release()
+        load(0.1)
+    assert limit.limit == 5
+
+
+def test_rate_limiter(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('yawf.admission.time.monotonic', lambda: now[0])
+
+    limiter = RateLimiter(rate=2, burst=2, header='X-Api-Key', max_keys=2)
+    first, second, third = ({'HTTP_X_API_KEY': key} for key in 'abc')
+
+    assert limiter.consume(first) == limiter.consume(first) == 0
+    assert limiter.consume(first) == 0.5
+    now[0] += 0.5
+    assert limiter.consume(first) == 0
+    assert limiter.consume(second) == 0
+
+    # the least recently seen key is forgotten
+    assert limiter.consume(third) == 0
+    assert len(limiter) == 2
+    assert limiter.consume(first) == 0
+    assert limiter.limited == 1
+
+
+def test_app_admission():
+    release = threading.Event()
+
+    def slow(request):
+        def stream():
+            release.wait(5)
+            yield b'done'
+        return StreamingResponse(stream())
+
+    admission = AdmissionControl(limit=4, retry_after=3)
+    admission.add_group('/slow', priority='low')
+    admission.add_group('/report', limit=1)
+
+    app = YAWF(admission=admission)
+    app.router.add_get('/slow', slow)
+    app.router.add_get('/report', slow)
+    app.router.add_get('/fast', lambda request: Response('fast'))
+
+    bodies = [start(app, path)[1] for path in ('/slow', '/slow', '/report')]
+    assert admission.limit.inflight == 3
+
+    # low priority may take only half of global limit
+    start_response, rejected = start(app, '/slow')
+    assert start_response.status == '503 Service Unavailable'
+    assert start_response.headers['Retry-After'] == '3'
+    assert b'Service Unavailable' in b''.join(rejected)
+
+    # group limit is taken
+    assert call(app, '/report')[0].status.startswith('503')
+    assert call(app, '/fast')[0].status.startswith('200')
+
+    # limit is held until server closes streamed body
+    release.set()
+    for body in bodies:
+        assert b''.join(body) == b'done'
+    assert admission.limit.inflight == 3
+
+    for body in bodies:
+        body.close()
+    assert admission.stats() == {
+        'limit': {'limit': 4, 'inflight': 0, 'rejected': 1},
+        'groups': {'/report': {'limit': 1, 'inflight': 0, 'rejected': 1}},
+        'limited': 0,
+    }
+
+
+def test_app_rate_limit():
+    app = YAWF(admission=AdmissionControl(rate_limiter=RateLimiter(rate=0.5, burst=1)), access_log=True)
+    app.router.add_get('/', lambda request: Response('Hello'))
+
+    assert call(app, environ={'REMOTE_ADDR': '10.0.0.1'})[0].status.startswith('200')
+    start_response, _ = call(app, environ={'REMOTE_ADDR': '10.0.0.1'})
+    assert start_response.status == '429 Too Many Requests'
+    assert start_response.headers['Retry-After'] == '2'
+    assert call(app, environ={'REMOTE_ADDR': '10.0.0.2'})[0].status.startswith('200')
+
+
+def test_unknown_priority():
+    with pytest.raises(ValueError):
+        AdmissionControl().add_group('/', priority='urgent')
+
+
+def test_asgi_admission():
+    admission = AdmissionControl(limit=1)
+    app = AsyncYAWF(admission=admission)
+
+    async def index(request):
+        assert not admission.limit.acquire()
+        return Response('Hello')
+
+    app.router.add_get('/', index)
+
+    status, headers, body = run(fake_server(app, 'GET', '/'))
+    assert status == 200 and body == b'Hello\n'
+    assert admission.limit.inflight == 0
@@ -5,11 +5,14 @@ from wsgiref.handlers import SimpleHandler
 
 import pytest
 
+from yawf import YAWF, Response
+from yawf.errors import BadRequest, RequestEntityTooLarge
 from yawf.router import MultipleRouteDefinition
-from yawf.wrappers import Cookies, Headers
+from yawf.wrappers import Cookies, EnvironHeaders, Headers, Request
 
 
 from ._app import app
+from ._helpers import StartResponse
 
 
 def create_base_env():
@@ -57,7 +60,7 @@ def create_request(path: str, method: str,
         length = env['wsgi.input'].write(body)
         # env['wsgi.input'].flush()
         env['wsgi.input'].seek(0)
-        env['HTTP_CONTENT_LENGTH'] = str(length)
+        env['CONTENT_LENGTH'] = str(length)
 
     if params is not None:
         env['QUERY_STRING'] = '&'.join(['{}={}'.format(key, val) for key, val in params.items()])
@@ -143,6 +146,17 @@ def test_get_error():
     assert '500' in response
 
 
+def test_json_render_error():
+    # payload is serialized before response is sent, so its errors get error page too
+    json_app = YAWF()
+    json_app.router.add_get('/', lambda request: Response({'x': object()}))
+
+    start_response = StartResponse()
+    body = json_app(create_request('/', 'GET'), start_response)
+    assert start_response.status.startswith('500')
+    assert b'Internal Server Error' in b''.join(body)
+
+
 def test_not_found():
     env = create_request('/not_found', 'GET')
     response = do_request(env)
@@ -183,6 +197,53 @@ def test_cookies():
     c.set('one', 'more')
     assert 'one' in c
 
+    assert Cookies('a=b=c; d=e') == Cookies(['a=b=c', 'd=e']) == {'a': 'b=c', 'd': 'e'}
+    assert Request(create_request('/', 'GET')).cookies == {}
+
+
+def test_set_cookie():
+    from yawf import Response
+
+    response = Response('data', cookies={'user': 'me'})
+    response.set_cookie('sid', 'secret', httponly=True)
+    response.delete_cookie('old')
+    headers = response.make_headers()
+
+    assert [value for name, value in headers if name == 'Set-Cookie'] == [
+        'user=me; Path=/',
+        'sid=secret; Path=/; HttpOnly',
+        'old=; Max-Age=0; Expires=Thu, 01 Jan 1970 00:00:00 GMT; Path=/',
+    ]
+    # headers are given to server as is
+    assert response.make_headers() is headers
+
+
+def test_response_cookies():
+    from yawf import Response
+
+    response = Response('data')
+    response.cookies['user'] = 'me'
+    response.cookies.set('sid', 'secret')
+    response.cookies = {'lang': 'en'}
+
+    assert response.cookies.setdefault('user', 'other') == 'me'
+    assert response.cookies.setdefault('theme', 'dark') == 'dark'
+    response.cookies |= {'font': 'mono'}
+
+    assert response.cookies == {'user': 'me', 'sid': 'secret', 'lang': 'en', 'theme': 'dark', 'font': 'mono'}
+    assert [value for name, value in response.make_headers() if name == 'Set-Cookie'] == [
+        'user=me; Path=/', 'sid=secret; Path=/', 'lang=en; Path=/', 'theme=dark; Path=/', 'font=mono; Path=/',
+    ]
+
+    # sent cookies can't be taken back from mapping, only deleted with header
+    for remove in (lambda: response.cookies.pop('user'), lambda: response.cookies.popitem(),
+                   lambda: response.cookies.__delitem__('user'), response.cookies.clear):
+        with pytest.raises(TypeError):
+            remove()
+    assert len(response.cookies) == 5
+
+    assert Response('data', cookies={'user': 'me'}).cookies == {'user': 'me'}
+
 
 def test_header_obj():
     h = Headers({'some': 'data'})
@@ -220,3 +281,207 @@ def test_url_args():
 
     assert '11' in response
     assert 'read' in response
+
+
+def test_iter_content():
+    body = b'0123456789' * 10
+    request = Request(create_request('/body', 'POST', body=body))
+
+    assert request.content_length == len(body)
+    assert list(request.iter_content(30)) == [body[:30], body[30:60], body[60:90], body[90:]]
+    assert list(request.iter_content(30)) == []
+
+    request = Request(create_request('/body', 'POST', body=body))
+    assert request.content == body
+    assert b''.join(request.iter_content(30)) == body
+
+
+def test_readinto():
+    body = b'0123456789' * 10
+    request = Request(create_request('/body', 'POST', body=body))
+    buffer = bytearray(64)
+
+    assert request.readinto(buffer) == 64
+    assert buffer == body[:64]
+    assert request.readinto(buffer) == 36
+    assert buffer[:36] == body[64:]
+    assert request.readinto(buffer) == 0
+
+    with pytest.raises(RuntimeError):
+        request.content
+
+
+def test_invalid_content_length():
+    for value in ('-1', '+5', ' 5', 'abc'):
+        env = create_request('/body', 'POST', body=b'0123456789')
+        env['CONTENT_LENGTH'] = value
+        env['wsgi.input_terminated'] = True
+        request = Request(env)
+
+        assert request.content_length is None
+        with pytest.raises(BadRequest):
+            request.content
+
+
+def test_max_content_length():
+    class LimitedRequest(Request):
+        max_content_length = 10
+
+    env = create_request('/body', 'POST', body=b'0123456789' * 2)
+    with pytest.raises(RequestEntityTooLarge):
+        LimitedRequest(env).content
+
+    # size of body is enforced while reading, if it was not declared
+    env = create_request('/body', 'POST', body=b'0123456789' * 2)
+    del env['CONTENT_LENGTH']
+    env['wsgi.input_terminated'] = True
+    request = LimitedRequest(env)
+    chunks = request.iter_content(4)
+
+    assert next(chunks) == b'0123'
+    with pytest.raises(RequestEntityTooLarge):
+        list(chunks)
+
+    env = create_request('/body', 'POST', body=b'0123456789')
+    assert LimitedRequest(env).content == b'0123456789'
+
+
+def test_headers_mutation():
+    h = Headers([('Content-Type', 'text/plain'), ('X-Some', 'one'), ('X-Some', 'two')])
+    wsgi_headers = h.wsgi_headers
+
+    assert h['content-type'] == 'text/plain'
+    assert h.getall('x-some') == ['one', 'two']
+    assert len(h) == 3
+
+    h['X-SOME'] = 'three'
+    assert h.getall('x-some') == ['three']
+    assert wsgi_headers == [('Content-Type', 'text/plain'), ('X-SOME', 'three')]
+
+    del h['content-type']
+    assert 'Content-Type' not in h
+    assert h.get('Content-Type') is None
+    assert list(h) == [('X-SOME', 'three')]
+    assert h.wsgi_headers is wsgi_headers
+
+    with pytest.raises(KeyError):
+        del h['content-type']
+
+
+def test_environ_headers():
+    env = create_request('/headers', 'GET', body=b'data', headers={
+        'Date': 'Tue, 15 Nov 1994 08:12:31 GMT',
+        'Accept': 'text/html, application/json;q=0.9,,',
+    })
+    env['CONTENT_TYPE'] = ''
+    h = EnvironHeaders(env)
+
+    assert h['date'] == 'Tue, 15 Nov 1994 08:12:31 GMT'
+    assert h['Content-Length'] == '4'
+    assert h.getall('user-agent') == ['test client']
+    assert h.getlist('accept') == ['text/html', 'application/json;q=0.9']
+    assert h.getlist('not existing') == []
+    assert 'content-type' not in h
+    assert 'HOST' in h
+
+    with pytest.raises(KeyError):
+        h['content-type']
+
+    assert ('User-Agent', 'test client') in list(h)
+    assert ('Content-Length', '4') in h.wsgi_headers
+    assert Headers(h)['date'] == 'Tue, 15 Nov 1994 08:12:31 GMT'
+    assert Headers([('Cache-Control', 'no-cache, no-store')]).getlist('cache-control') == ['no-cache', 'no-store']
+
+
+def test_args():
+    env = create_request('/data', 'GET')
+    env['QUERY_STRING'] = 'a=1&a=2&b=x%3Dy+z&empty=&n=ten&flag'
+    request = Request(env)
+    args = request.args
+
+    assert request.args is args
+    assert args['a'] == '1'
+    assert args.get_list('a') == ['1', '2']
+    assert args.get_list('a', type=int) == [1, 2]
+    assert args['b'] == 'x=y z'
+    assert args['empty'] == ''
+    assert args.get_int('a') == 1
+    assert args.get_int('n') is None
+    assert args.get_int('missing', 0) == 0
+    assert set(args) == {'a', 'b', 'empty', 'n', 'flag'}
+
+    with pytest.raises(TypeError):
+        args['a'] = 'changed'
+
+    assert Request(create_request('/', 'GET')).args == {}
+
+
+def test_path_segments():
+    request = Request(create_request('/prod/11/read/', 'GET'))
+
+    assert request.path_segments == ('prod', '11', 'read')
+    assert request.path_segments is request.path_segments
+
+
+def test_access_log():
+    from yawf import YAWF, Response
+    from yawf.wrappers import StreamingResponse
+
+    records = []
+
+    class LoggedApp(YAWF):
+        def log_access(self, environment, status, length, duration):
+            assert duration >= 0
+            records.append((environment['PATH_INFO'], status, length))
+
+    logged = LoggedApp(access_log=True)
+    logged.router.add_get('/', lambda request: Response('Hello'))
+    logged.router.add_get('/stream', lambda request: StreamingResponse(iter([b'ab', b'cde'])))
+
+    start_response = StartResponse()
+    logged(create_request('/', 'GET'), start_response)
+    assert records == [('/', 200, 6)]
+
+    body = logged(create_request('/stream', 'GET'), start_response)
+    assert b''.join(body) == b'abcde'
+    assert len(records) == 1
+    body.close()
+    assert records[1] == ('/stream', 200, 5)
+
+    body = logged(create_request('/missing', 'GET'), start_response)
+    assert records[2] == ('/missing', 404, len(body[0]))
+
+
+def test_middleware():
+    from yawf import YAWF, Response
+
+    calls = []
+
+    def tracing(name):
+        def middleware(handler):
+            def wrapper(request, **kwargs):
+                calls.append(name)
+                response = handler(request, **kwargs)
+                response.headers.add('X-Trace', name)
+                return response
+            return wrapper
+        return middleware
+
+    def item(request, id):
+        calls.append('handler')
+        return Response('item {}'.format(id))
+
+    mw_app = YAWF()
+    mw_app.use(tracing('outer'))
+    mw_app.use(tracing('inner'))
+    mw_app.router.add_get(r'/items/(?P<id>\d+)', item, middleware=[tracing('route')])
+
+    start_response = StartResponse()
+    body = mw_app(create_request('/items/7', 'GET'), start_response)
+
+    assert body[0].decode().strip() == 'item 7'
+    assert calls == ['outer', 'inner', 'route', 'handler']
+    assert [val for name, val in start_response.header_list if name == 'X-Trace'] == ['route', 'inner', 'outer']
+
+    with pytest.raises(RuntimeError):
+        mw_app.use(tracing('late'))
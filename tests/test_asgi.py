@@ -0,0 +1,149 @@
+import json
+
+import pytest
+
+from yawf import AsyncYAWF, Response
+from yawf.asgi import scope_to_environ
+
+from ._helpers import fake_server, run
+
+
+def make_app():
+    app = AsyncYAWF(max_workers=2)
+
+    async def index(request):
+        return Response('Hello async!!!')
+
+    def sync_echo(request):
+        return Response(request.json)
+
+    async def streamed(request):
+        sizes = []
+        async for chunk in request.stream():
+            sizes.append(len(chunk))
+        return Response(sizes)
+
+    async def item(request, id):
+        return Response({'id': id, 'body': (await request.body()).decode()})
+
+    async def error(request):
+        raise ValueError
+
+    async def bad_json(request):
+        return Response({'x': object()})
+
+    app.router.add_get('/', index)
+    app.router.add_post('/echo', sync_echo)
+    app.router.add_post('/stream', streamed)
+    app.router.add_put(r'/items/(?P<id>\d+)', item)
+    app.router.add_get('/error', error)
+    app.router.add_get('/bad_json', bad_json)
+    return app
+
+
+def test_async_handler():
+    status, headers, body = run(fake_server(make_app(), 'GET', '/'))
+
+    assert status == 200
+    assert headers[b'content-type'] == b'text/plain'
+    assert body.decode().strip() == 'Hello async!!!'
+
+
+def test_sync_handler_body():
+    data = {'some': 'interesting data'}
+    chunks = [json.dumps(data).encode()[:5], json.dumps(data).encode()[5:]]
+
+    status, headers, body = run(fake_server(make_app(), 'POST', '/echo', chunks))
+
+    assert status == 200
+    assert json.loads(body.decode()) == data
+
+
+def test_streamed_body():
+    status, headers, body = run(fake_server(make_app(), 'POST', '/stream', [b'ab', b'', b'cde']))
+
+    assert json.loads(body.decode()) == [2, 3]
+
+
+def test_url_args():
+    status, headers, body = run(fake_server(make_app(), 'PUT', '/items/12', [b'data']))
+
+    assert json.loads(body.decode()) == {'id': '12', 'body': 'data'}
+
+
+def test_errors():
+    app = make_app()
+
+    assert run(fake_server(app, 'GET', '/not_found'))[0] == 404
+    assert run(fake_server(app, 'POST', '/'))[0] == 405
+    assert run(fake_server(app, 'GET', '/error'))[0] == 500
+    assert run(fake_server(app, 'GET', '/bad_json'))[0] == 500
+
+
+def test_async_hooks():
+    app = make_app()
+    calls = []
+
+    async def before_response(request):
+        calls.append(request.path)
+        return request
+
+    async def after_response(response):
+        response.headers.add('X-Hooked', 'yes')
+        return response
+
+    app.before_response = before_response
+    app.after_response = after_response
+
+    status, headers, body = run(fake_server(app, 'GET', '/'))
+
+    assert calls == ['/']
+    assert headers[b'x-hooked'] == b'yes'
+
+
+def test_lifespan():
+    app = make_app()
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    run(app({'type': 'lifespan'}, receive, send))
+
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+
+def test_scope_to_environ():
+    env = scope_to_environ({
+        'type': 'http', 'method': 'GET', 'path': '/', 'query_string': b'a=1',
+        'headers': [(b'content-type', b'text/plain'), (b'accept', b'a'), (b'accept', b'b'),
+                    (b'cookie', b'a=1'), (b'cookie', b'b=2')],
+    })
+
+    assert env['QUERY_STRING'] == 'a=1'
+    assert env['CONTENT_TYPE'] == 'text/plain'
+    assert env['HTTP_ACCEPT'] == 'a,b'
+    assert env['HTTP_COOKIE'] == 'a=1; b=2'
+
+    with pytest.raises(KeyError):
+        env['HTTP_CONTENT_TYPE']
+
+
+def test_async_middleware():
+    app = make_app()
+
+    def middleware(handler):
+        async def wrapper(request, **kwargs):
+            response = await handler(request, **kwargs)
+            response.headers.add('X-Middleware', 'async')
+            return response
+        return wrapper
+
+    app.use(middleware)
+    status, headers, body = run(fake_server(app, 'GET', '/'))
+
+    assert headers[b'x-middleware'] == b'async'
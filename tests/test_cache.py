@@ -0,0 +1,160 @@
+import threading
+import time
+
+from yawf import YAWF, Response, StreamingResponse
+from yawf.cache import ResponseCache, etag_matches
+
+from ._helpers import call
+
+
+def make_app(cache, calls, **kwargs):
+    def items(request):
+        calls.append(request.args.get('page'))
+        return Response({'page': request.args.get('page'), 'lang': request.headers.get('Accept-Language')})
+
+    app = YAWF()
+    app.router.add_get('/items', items, middleware=[cache.cached(**kwargs)])
+    app.router.add_get('/stream', lambda request: StreamingResponse(iter([b'a'])),
+                       middleware=[cache.cached()])
+    return app
+
+
+def test_etag_matches():
+    assert etag_matches('*', '"a"')
+    assert etag_matches('"b", W/"a"', '"a"')
+    assert not etag_matches('"b"', '"a"')
+
+
+def test_cache_hit():
+    calls = []
+    cache = ResponseCache()
+    app = make_app(cache, calls, args=('page',), vary=('Accept-Language',))
+
+    first, body = call(app, '/items', query='page=1&other=2')
+    second, cached_body = call(app, '/items', query='page=1&other=3')
+
+    assert calls == ['1']
+    assert body == cached_body == b'{"page":"1","lang":null}'
+    assert first.headers == second.headers
+    assert first.headers['ETag'].startswith('"')
+    assert first.headers['Vary'] == 'Accept-Language'
+
+    call(app, '/items', query='page=2')
+    call(app, '/items', query='page=1', accept_language='en')
+    assert calls == ['1', '2', '1']
+    assert cache.cache_info()[:3] == (1, 3, 3)
+
+    call(app, '/stream')
+    call(app, '/stream')
+    assert cache.cache_info().size == 3
+
+
+def test_not_modified():
+    calls = []
+    cache = ResponseCache()
+    app = make_app(cache, calls)
+
+    start_response, _ = call(app, '/items')
+    etag = start_response.headers['ETag']
+
+    start_response, body = call(app, '/items', if_none_match=etag)
+    assert start_response.status.startswith('304')
+    assert start_response.headers['ETag'] == etag
+    assert body == b''
+    assert len(calls) == 1
+
+
+def test_eviction():
+    calls = []
+    cache = ResponseCache(max_bytes=200, ttl=0.05)
+    app = make_app(cache, calls)
+
+    for page in range(3):
+        call(app, '/items', query='page={}'.format(page))
+
+    # only the most recent entries fit into byte budget
+    assert cache.bytes <= 200
+    assert cache.cache_info().size < 3
+    call(app, '/items', query='page=2')
+    assert calls == ['0', '1', '2']
+
+    time.sleep(0.06)
+    call(app, '/items', query='page=2')
+    assert calls == ['0', '1', '2', '2']
+
+
+def test_thundering_herd():
+    cache = ResponseCache()
+    calls = []
+    started = threading.Event()
+
+    def slow(request):
+        calls.append(1)
+        started.wait(1)
+        return Response('slow')
+
+    app = YAWF()
+    app.router.add_get('/slow', slow, middleware=[cache.cached()])
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(call(app, '/slow')[1])) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    started.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [b'slow\n'] * 5
+
+
+def test_response_tasks():
+    cache = ResponseCache()
+    done = []
+
+    def index(request):
+        response = Response('Hello')
+        response.add_task(done.append, 'response')
+        return response
+
+    app = YAWF()
+    app.router.add_get('/', index, middleware=[cache.cached()])
+
+    for _ in range(2):
+        assert call(app)[1] == b'Hello\n'
+    app.shutdown()
+
+    # cache hit does not call handler, so it has no tasks
+    assert done == ['response']
+
+
+def test_uncacheable_herd():
+    cache = ResponseCache()
+    lock = threading.Lock()
+    active, calls = [], []
+    overlapped = threading.Event()
+
+    def uncacheable(request):
+        with lock:
+            active.append(1)
+            calls.append(1)
+            if len(active) > 1:
+                overlapped.set()
+        overlapped.wait(0.5)
+        with lock:
+            active.pop()
+        return Response('busy', status=503)
+
+    app = YAWF()
+    app.router.add_get('/busy', uncacheable, middleware=[cache.cached()])
+
+    threads = [threading.Thread(target=call, args=(app, '/busy')) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # waiters do not queue up behind each other, once response turned out not cacheable
+    assert overlapped.is_set()
+    assert len(calls) == 3
@@ -0,0 +1,59 @@
+import json
+
+from yawf import YAWF, Response
+from yawf.codec import JSONCodec, default_codec, detect_encoding
+
+from ._helpers import call
+
+
+def test_json_codec():
+    codec = JSONCodec()
+    data = {'text': 'привет', 'items': [1, 2.5, None, True]}
+
+    assert codec.dumps(data) == b'{"text":"\\u043f\\u0440\\u0438\\u0432\\u0435\\u0442","items":[1,2.5,null,true]}'
+    assert codec.loads(codec.dumps(data)) == data
+    assert codec.loads(json.dumps(data, ensure_ascii=False).encode('utf-16')) == data
+    assert codec.loads(bytearray(b'[1]')) == [1]
+
+
+def test_detect_encoding():
+    data = json.dumps({'text': 'привет'}, ensure_ascii=False)
+    for encoding in ('utf-8', 'utf-8-sig', 'utf-16', 'utf-16-le', 'utf-16-be', 'utf-32', 'utf-32-le', 'utf-32-be'):
+        assert JSONCodec().loads(data.encode(encoding)) == {'text': 'привет'}
+        assert detect_encoding(data.encode(encoding)) == encoding
+
+    assert detect_encoding(b'1') == detect_encoding(b'') == 'utf-8'
+    assert detect_encoding('1'.encode('utf-16-le')) == 'utf-16-le'
+
+
+def test_response_render():
+    response = Response({'a': 1})
+
+    assert response.response is None
+    assert response.content_length == 7
+    assert response.response == [b'{"a":1}']
+    assert response.headers['Content-Length'] == '7'
+
+
+class UpperCodec:
+    """
+    Codec, that marks everything it touched.
+    """
+
+    def dumps(self, obj):
+        return default_codec.dumps({'codec': 'upper', 'data': obj})
+
+    def loads(self, data):
+        return {'codec': 'upper', 'data': default_codec.loads(data)}
+
+
+def test_app_codec():
+    from io import BytesIO
+
+    app = YAWF(json_codec=UpperCodec())
+    app.router.add_post('/echo', lambda request: Response(request.json))
+
+    body = b'[1, 2]'
+    result = call(app, '/echo', 'POST', environ={'CONTENT_LENGTH': str(len(body)), 'wsgi.input': BytesIO(body)})[1]
+
+    assert json.loads(result.decode()) == {'codec': 'upper', 'data': {'codec': 'upper', 'data': [1, 2]}}
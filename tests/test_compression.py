@@ -0,0 +1,85 @@
+import gzip
+import zlib
+
+from yawf import YAWF, Response, StreamingResponse
+from yawf.compression import Compression, is_compressible, parse_accept_encoding
+
+from ._helpers import call
+
+
+def make_app(**kwargs):
+    app = YAWF(compression=Compression(**kwargs))
+    app.router.add_get('/json', lambda request: Response({'items': list(range(500))}))
+    app.router.add_get('/small', lambda request: Response('small'))
+    app.router.add_get('/stream', lambda request: StreamingResponse(
+        (b'chunk %d ' % i for i in range(1000)), content_type='text/plain'))
+    app.router.add_get('/binary', lambda request: StreamingResponse(iter([b'\x00' * 1000])))
+    return app
+
+
+def test_helpers():
+    assert is_compressible('application/json')
+    assert is_compressible('text/html; charset=utf-8')
+    assert is_compressible('application/problem+json')
+    assert not is_compressible('image/png')
+    assert parse_accept_encoding('gzip;q=0.5, br, identity;q=0') == {'gzip': 0.5, 'br': 1.0, 'identity': 0.0}
+
+
+def test_list_body():
+    start_response, data = call(make_app(), '/json', accept_encoding='gzip, deflate')
+
+    assert start_response.headers['Content-Encoding'] == 'gzip'
+    assert start_response.headers['Vary'] == 'Accept-Encoding'
+    assert start_response.headers['Content-Length'] == str(len(data))
+    assert b'"items"' in gzip.decompress(data)
+
+
+def test_negotiation():
+    start_response, data = call(make_app(), '/json', accept_encoding='gzip;q=0.5, deflate')
+    assert start_response.headers['Content-Encoding'] == 'deflate'
+    assert b'"items"' in zlib.decompress(data)
+
+    start_response, data = call(make_app(), '/json', accept_encoding='gzip;q=0, br')
+    assert 'Content-Encoding' not in start_response.headers
+    assert start_response.headers['Vary'] == 'Accept-Encoding'
+
+    start_response, data = call(make_app(), '/json')
+    assert 'Content-Encoding' not in start_response.headers
+
+
+def test_min_size_and_content_type():
+    start_response, data = call(make_app(), '/small', accept_encoding='gzip, deflate')
+    assert 'Content-Encoding' not in start_response.headers
+    assert data == b'small\n'
+
+    start_response, data = call(make_app(), '/binary', accept_encoding='gzip, deflate')
+    assert 'Content-Encoding' not in start_response.headers
+    assert 'Vary' not in start_response.headers
+
+
+def test_streaming_body():
+    start_response, data = call(make_app(), '/stream', accept_encoding='gzip, deflate')
+
+    assert start_response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in start_response.headers
+    assert gzip.decompress(data) == b''.join(b'chunk %d ' % i for i in range(1000))
+
+
+def test_cache():
+    compression = Compression(cache_size=1)
+    app = make_app()
+    app.compression = compression
+
+    first = call(app, '/json', accept_encoding='gzip, deflate')[1]
+    second = call(app, '/json', accept_encoding='gzip, deflate')[1]
+
+    assert first is second
+    assert len(compression._cache) == 1
+
+
+def test_etag():
+    app = make_app()
+    app.router.add_get('/tagged', lambda request: Response({'items': list(range(500))}, headers={'ETag': '"abc"'}))
+
+    assert call(app, '/tagged', accept_encoding='gzip, deflate')[0].headers['ETag'] == 'W/"abc"'
+    assert call(app, '/tagged')[0].headers['ETag'] == '"abc"'
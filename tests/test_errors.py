@@ -0,0 +1,58 @@
+import json
+
+from yawf.errors import HttpError, InternalServerError, MethodNotAllowed, NotFound, prefers_json
+
+from ._helpers import call
+
+
+def test_prefers_json():
+    assert not prefers_json(None)
+    assert not prefers_json('text/html,application/xhtml+xml,*/*;q=0.8')
+    assert prefers_json('application/json')
+    assert prefers_json('application/problem+json, */*;q=0.1')
+    assert not prefers_json('application/json;q=0.5, text/html')
+    assert prefers_json('text/html;q=0.5, application/json')
+
+
+def test_html_error():
+    start_response, body = call(NotFound('/missing'))
+
+    assert start_response.status == '404 Not Found'
+    assert start_response.headers == {'Content-Type': 'text/html', 'Vary': 'Accept', 'Content-Length': str(len(body))}
+    assert b'<h1>Not Found</h1>' in body
+
+
+def test_json_error():
+    start_response, body = call(MethodNotAllowed(), accept='application/json')
+
+    assert start_response.status == '405 Method Not Allowed'
+    assert start_response.headers['Content-Type'] == 'application/json'
+    assert start_response.headers['Vary'] == 'Accept'
+    assert json.loads(body.decode()) == {
+        'code': 405, 'name': 'Method Not Allowed', 'description': MethodNotAllowed.description,
+    }
+
+
+def test_prerendered_error():
+    first, first_body = call(InternalServerError())
+    second, second_body = call(InternalServerError())
+
+    # body is rendered once and reused, headers are copied for every response
+    assert first_body is second_body
+    assert first.header_list == second.header_list
+    assert first.header_list is not second.header_list
+    assert ('Vary', 'Accept') in first.header_list
+
+    start_response, body = call(InternalServerError('<custom> description'))
+    assert b'&lt;custom&gt; description' in body
+
+
+def test_custom_rendering():
+    class Teapot(HttpError):
+        code = 418
+
+        def get_description(self, environ):
+            return '<p>{}</p>'.format(environ['PATH_INFO'])
+
+    assert b'<p>/one</p>' in call(Teapot(), '/one')[1]
+    assert b'<p>/two</p>' in call(Teapot(), '/two')[1]
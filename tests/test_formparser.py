@@ -0,0 +1,113 @@
+from io import BytesIO
+
+import pytest
+
+from yawf.errors import BadRequest, RequestEntityTooLarge
+from yawf.formparser import FormDataParser, parse_options_header
+from yawf.wrappers import Request
+
+BOUNDARY = 'xYzZY'
+
+
+def make_multipart(parts):
+    lines = []
+    for name, value, filename in parts:
+        lines.append(b'--' + BOUNDARY.encode())
+        disposition = 'Content-Disposition: form-data; name="{}"'.format(name)
+        if filename is not None:
+            disposition += '; filename="{}"'.format(filename)
+            lines.append(disposition.encode())
+            lines.append(b'Content-Type: application/octet-stream')
+        else:
+            lines.append(disposition.encode())
+        lines.append(b'')
+        lines.append(value)
+    lines.append(b'--' + BOUNDARY.encode() + b'--')
+    lines.append(b'')
+    return b'\r\n'.join(lines)
+
+
+def make_request(body, content_type='multipart/form-data; boundary=' + BOUNDARY, parser=None):
+    class FormRequest(Request):
+        __slots__ = ()
+        form_parser = parser
+
+    return FormRequest({
+        'REQUEST_METHOD': 'POST',
+        'PATH_INFO': '/',
+        'CONTENT_TYPE': content_type,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+    })
+
+
+def test_parse_options_header():
+    assert parse_options_header('form-data; name="a;b"; filename="x \\"y\\".txt"') == \
+        ('form-data', {'name': 'a;b', 'filename': 'x "y".txt'})
+    assert parse_options_header("attachment; filename*=utf-8''%E2%82%AC.txt") == \
+        ('attachment', {'filename': '€.txt'})
+    assert parse_options_header('') == ('', {})
+
+
+def test_urlencoded():
+    request = make_request(b'a=1&b=&a=2', 'application/x-www-form-urlencoded')
+    assert request.form.getlist('a') == ['1', '2']
+    assert request.form['b'] == ''
+    assert len(request.files) == 0
+
+
+def test_multipart():
+    content = bytes(range(256)) * 1000 + b'\r\n--xYzZ'
+    body = make_multipart([
+        ('title', 'привет'.encode(), None),
+        ('upload', content, 'data.bin'),
+        ('empty', b'', 'empty.txt'),
+    ])
+
+    # small chunks make delimiters split between reads
+    for chunk_size in (7, 1024, 64 * 1024):
+        request = make_request(body, parser=FormDataParser(chunk_size=chunk_size, spool_size=1024))
+
+        assert request.form['title'] == 'привет'
+        upload = request.files['upload']
+        assert (upload.filename, upload.content_type, upload.size) == ('data.bin', 'application/octet-stream',
+                                                                       len(content))
+        assert upload.read() == content
+        assert upload.stream._rolled
+        assert request.files['empty'].read() == b''
+
+
+def test_multipart_save():
+    request = make_request(make_multipart([('upload', b'content', 'a.txt')]))
+    target = BytesIO()
+    request.files['upload'].save(target)
+    assert target.getvalue() == b'content'
+
+
+def test_multipart_limits():
+    body = make_multipart([('field', b'x' * 100, None), ('upload', b'y' * 1000, 'a.txt')])
+
+    with pytest.raises(RequestEntityTooLarge):
+        make_request(body, parser=FormDataParser(max_part_size=999)).files
+
+    with pytest.raises(RequestEntityTooLarge):
+        make_request(body, parser=FormDataParser(max_form_memory_size=99)).form
+
+    with pytest.raises(RequestEntityTooLarge):
+        make_request(body, parser=FormDataParser(max_content_length=len(body) - 1)).form
+
+    with pytest.raises(RequestEntityTooLarge):
+        make_request(body, parser=FormDataParser(max_parts=1)).form
+
+    assert make_request(body, parser=FormDataParser(max_part_size=1000, max_form_memory_size=100)).files
+
+
+def test_multipart_invalid():
+    with pytest.raises(BadRequest):
+        make_request(b'', 'multipart/form-data').form
+
+    with pytest.raises(BadRequest):
+        make_request(make_multipart([('upload', b'content', 'a.txt')])[:-10]).form
+
+    with pytest.raises(BadRequest):
+        make_request(b'--xYzZY\r\nContent-Type: text/plain\r\n\r\ndata\r\n--xYzZY--\r\n').form
@@ -0,0 +1,78 @@
+from yawf import YAWF, Response, StreamingResponse
+from yawf.metrics import Histogram, Metrics, PHASES
+
+from ._helpers import StartResponse, call
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(1, 2, 5))
+    for value in (0.5, 1.5, 1.5, 4, 10):
+        histogram.observe(value)
+
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.count == 5
+    assert histogram.sum == 17.5
+    assert histogram.percentile(0.5) == 2
+    assert histogram.percentile(0.99) == 10
+    assert Histogram().percentile(0.5) == 0.0
+
+
+def test_app_metrics():
+    routes = []
+
+    def item(request, id):
+        routes.append(request.route.rule)
+        return Response({'id': id})
+
+    metrics = Metrics()
+    app = YAWF(metrics=metrics)
+    app.router.add_get('/items/<int:id>', item)
+    app.router.add_get('/stream', lambda request: StreamingResponse(iter([b'ab', b'cde'])))
+
+    calls = []
+    metrics.subscribe(lambda environ, route, status, timings: calls.append((route and route.rule, status, timings)))
+
+    assert call(app, '/items/1')[1] == b'{"id":1}'
+    call(app, '/items/2')
+    call(app, '/stream')
+    call(app, '/missing')
+
+    assert routes == ['/items/<int:id>'] * 2
+    assert [call[:2] for call in calls] == [('/items/<int:id>', 200), ('/items/<int:id>', 200),
+                                            ('/stream', 200), (None, 404)]
+    assert set(calls[0][2]) == set(PHASES)
+    assert all(value >= 0 for value in calls[0][2].values())
+    # lookup failed, so handler phase was never reached
+    assert 'handler' not in calls[3][2]
+
+    snapshot = metrics.snapshot()
+    assert snapshot['routes']['GET /items/<int:id>']['requests'] == 2
+    assert snapshot['routes']['GET /stream']['requests'] == 1
+    assert snapshot['routes'][None]['requests'] == 1
+    assert snapshot['phases']['total']['count'] == 4
+    assert snapshot['phases']['handler']['count'] == 3
+
+    metrics.reset()
+    assert metrics.snapshot() == {'phases': {}, 'routes': {}}
+
+
+def test_app_metrics_errors():
+    def fail(request):
+        raise ValueError
+
+    metrics = Metrics()
+    app = YAWF(metrics=metrics)
+    app.router.add_get('/fail', fail)
+
+    call(app, '/fail')
+    stats = metrics.snapshot()['routes']['GET /fail']
+    assert stats['requests'] == stats['errors'] == 1
+
+
+def test_metrics_disabled():
+    app = YAWF()
+    app.router.add_get('/', lambda request: Response('Hello'))
+
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/', 'QUERY_STRING': ''}
+    assert app(environ, StartResponse()) == [b'Hello\n']
+    assert 'yawf.timings' not in environ
@@ -0,0 +1,228 @@
+import re
+import uuid
+import pickle
+
+import pytest
+
+from yawf.errors import NotFound, MethodNotAllowed
+from yawf.router import Router, BuildError, MultipleRouteDefinition, split_rule
+
+
+def handler(request, **kwargs):
+    return kwargs
+
+
+def other(request, **kwargs):
+    return kwargs
+
+
+def test_split_rule():
+    assert split_rule('/data') == ('/data', True)
+    assert split_rule('^/data$') == ('/data', True)
+    assert split_rule('/prod/(?P<id>\\d+)') == ('/prod/', False)
+    assert split_rule('/items?') == ('/item', False)
+    assert split_rule('/a|/b') == ('', False)
+    assert split_rule('(?i)/data') == ('', False)
+
+
+def test_static_route():
+    router = Router()
+    router.add_get('/data', handler)
+    router.add_post('/data', other)
+
+    assert router.search_route('/data', 'GET') == (handler, {})
+    assert router.search_route('/data', 'POST') == (other, {})
+
+    with pytest.raises(MethodNotAllowed):
+        router.search_route('/data', 'PUT')
+
+    with pytest.raises(NotFound):
+        router.search_route('/data/', 'GET')
+
+
+def test_regex_route():
+    router = Router()
+    router.add_get(r'/prod/(?P<id>\d+)/(?P<action>[a-z]+)', handler)
+    router.add_get(r'/(?P<name>\w+)', other)
+
+    assert router.search_route('/prod/1/read', 'GET') == (handler, {'id': '1', 'action': 'read'})
+    assert router.search_route('/prod', 'GET') == (other, {'name': 'prod'})
+
+    with pytest.raises(MethodNotAllowed):
+        router.search_route('/prod/1/read', 'POST')
+
+    with pytest.raises(NotFound):
+        router.search_route('/prod/x/read', 'GET')
+
+
+def test_route_order():
+    router = Router()
+    router.add_get(r'/files/(?P<name>.+)', handler)
+    router.add_post(r'/files/static/(?P<name>.+)', other)
+
+    # routes are looked up by insertion order, not by prefix tree depth
+    assert router.search_route('/files/static/a', 'GET') == (handler, {'name': 'static/a'})
+    assert router.search_route('/files/static/a', 'POST') == (other, {'name': 'a'})
+
+    router = Router()
+    router.add_get(r'/files/static/(?P<name>.+)', other)
+    router.add_get(r'/(?P<path>.+)', handler)
+
+    assert router.search_route('/files/static/a', 'GET') == (other, {'name': 'a'})
+    assert router.search_route('/files/a', 'GET') == (handler, {'path': 'files/a'})
+
+
+def test_static_falls_back_to_regex():
+    router = Router()
+    router.add_get('/data', handler)
+    router.add_post(r'/(?P<name>[a-z]+)', other)
+
+    assert router.search_route('/data', 'POST') == (other, {'name': 'data'})
+
+
+def test_regex_before_static():
+    router = Router()
+    router.add_get(r'/(?P<name>[a-z]+)', handler)
+    router.add_get('/data', other)
+    router.add_post('/data', other)
+
+    # static route is not preferred over regex route added earlier
+    assert router.search_route('/data', 'GET') == (handler, {'name': 'data'})
+    assert router.search_route('/data', 'POST') == (other, {})
+
+
+def test_equivalent_rules():
+    router = Router()
+    router.add_get('/data', handler)
+
+    with pytest.raises(MultipleRouteDefinition):
+        router.add_get('^/data$', other)
+    assert router.search_route('/data', 'GET') == (handler, {})
+
+    router.add_post('^/data$', other)
+    assert router.search_route('/data', 'POST') == (other, {})
+
+
+def test_routes_per_instance():
+    router = Router()
+    router.add_get('/data', handler)
+
+    assert Router()._routes == {}
+
+    with pytest.raises(NotFound):
+        Router().search_route('/data', 'GET')
+
+
+def test_route_cache():
+    router = Router(cache_size=2)
+    router.add_get(r'/prod/(?P<id>\d+)', handler)
+
+    assert router.search_route('/prod/1', 'GET') == (handler, {'id': '1'})
+    assert router.search_route('/prod/1', 'GET') == (handler, {'id': '1'})
+    assert router.cache_info() == (1, 1, 1, 2)
+
+    router.search_route('/prod/2', 'GET')
+    router.search_route('/prod/3', 'GET')
+    assert router.cache_info().size == 2
+
+    # least recently used entry was evicted
+    router.search_route('/prod/1', 'GET')
+    assert router.cache_info().misses == 4
+
+    with pytest.raises(NotFound):
+        router.search_route('/other', 'GET')
+
+    router.add_get('/other', other)
+    assert router.cache_info() == (0, 0, 0, 2)
+    assert router.search_route('/other', 'GET') == (other, {})
+
+
+def test_template_route():
+    router = Router()
+    router.add_get('/users/<int:id>', handler)
+    router.add_get('/users/<int:id>/score/<float:value>', other)
+    router.add_post('/files/<path:name>', handler)
+    router.add_get('/items/<uuid:key>.json', other)
+    router.add_get('/tags/<tag>', other)
+
+    assert router.search_route('/users/12', 'GET') == (handler, {'id': 12})
+    assert router.search_route('/users/1/score/0.5', 'GET') == (other, {'id': 1, 'value': 0.5})
+    assert router.search_route('/files/a/b.txt', 'POST') == (handler, {'name': 'a/b.txt'})
+    assert router.search_route('/tags/a.b', 'GET') == (other, {'tag': 'a.b'})
+
+    key = uuid.uuid4()
+    assert router.search_route('/items/{}.json'.format(key), 'GET') == (other, {'key': key})
+
+    with pytest.raises(NotFound):
+        router.search_route('/users/x', 'GET')
+
+    with pytest.raises(NotFound):
+        # literal parts of template are not regex
+        router.search_route('/items/{}xjson'.format(key), 'GET')
+
+    with pytest.raises(ValueError):
+        router.add_get('/users/<bool:flag>', handler)
+
+
+def test_template_route_index():
+    router = Router()
+    router.add_get('/users/<int:id>', handler)
+
+    assert router._static == {}
+    assert list(router._tree.children) == ['users']
+
+
+def test_url_for():
+    router = Router()
+    router.add_get('/users/<int:id>/files/<path:name>', handler)
+    router.add_get('/data', other)
+    router.add_get(r'/prod/(?P<id>\d+)', other, name='prod')
+
+    assert router.url_for('handler', id=1, name='a b/c.txt') == '/users/1/files/a%20b/c.txt'
+    assert router.url_for('other', page=2) == '/data?page=2'
+
+    with pytest.raises(BuildError):
+        router.url_for('handler', id=1)
+
+    with pytest.raises(BuildError):
+        router.url_for('prod', id=1)
+
+    with pytest.raises(BuildError):
+        router.url_for('missing')
+
+
+def test_snapshot():
+    router = Router()
+    router.add_get('/data', handler)
+    router.add_get('/users/<int:id>', other, name='user')
+    router.add_get('/prod/(?P<id>\\d+)', handler, name='prod')
+    assert router.search_route('/prod/1', 'GET') == (handler, {'id': '1'})
+
+    loaded = Router.from_snapshot(router.snapshot(), cache_size=10)
+    assert loaded.cache_size == 10
+    assert loaded.search_route('/data', 'GET') == (handler, {})
+    assert loaded.search_route('/users/7', 'GET') == (other, {'id': 7})
+    assert loaded.search_route('/prod/2', 'GET') == (handler, {'id': '2'})
+    assert loaded.url_for('user', id=3) == '/users/3'
+
+    # routes keep shared identity and new routes go after loaded ones
+    loaded.add_get('/users/<id>', handler)
+    assert loaded.search_route('/users/8', 'GET') == (other, {'id': 8})
+    assert loaded._names['user'] is loaded.match('/users/3', 'GET')[0]
+
+    with pytest.raises(ValueError):
+        Router.from_snapshot(pickle.dumps((0,)))
+
+    # closures are named by route, which uses them
+    router.add_get('/closure', lambda request: None)
+    with pytest.raises(TypeError, match='GET /closure'):
+        router.snapshot()
+
+
+def test_invalid_regex_route():
+    router = Router()
+    with pytest.raises(re.error):
+        router.add_get('/users/(?P<name[a-z]+)', other)
+
+    router.add_get('/users/(?P<id>\\d+)', handler)
+    assert router.search_route('/users/5', 'GET') == (handler, {'id': '5'})
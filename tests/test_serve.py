@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import signal
+import socket
+import subprocess
+import http.client
+
+import pytest
+
+from yawf import YAWF, Response
+from yawf.serve import WorkerServer, load_app, make_socket, parse_bind
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+app = YAWF()
+app.router.add_get('/pid', lambda request: Response(str(os.getpid())))
+
+
+def test_load_app():
+    assert load_app('tests.test_serve:app') is app
+    assert load_app('tests.test_serve') is app
+    assert load_app('tests.test_serve:app.router') is app.router
+
+    with pytest.raises(AttributeError):
+        load_app('tests.test_serve:missing')
+
+
+def test_parse_bind():
+    assert parse_bind('0.0.0.0:80') == ('0.0.0.0', 80)
+    assert parse_bind(':8000') == ('127.0.0.1', 8000)
+    assert parse_bind('[::1]:8000') == ('::1', 8000)
+
+
+def test_accepted_socket_blocks():
+    class InheritingSocket:
+        """
+        Listening socket, which connections inherit its non-blocking mode, like on BSD and macOS.
+        """
+
+        def __init__(self, sock):
+            self.sock = sock
+
+        def accept(self):
+            conn, address = self.sock.accept()
+            conn.setblocking(self.sock.gettimeout() is None)
+            return conn, address
+
+    sock = make_socket(('127.0.0.1', 0))
+    server = WorkerServer(sock, app, threads=1)
+    server.socket = InheritingSocket(sock)
+    try:
+        with socket.create_connection(sock.getsockname()[:2]):
+            time.sleep(0.05)
+            conn, address = server.get_request()
+            with conn:
+                assert conn.gettimeout() is None
+    finally:
+        server.executor.shutdown()
+        sock.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get_pid(port: int, timeout: float = 10.0) -> int:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/pid')
+            return int(connection.getresponse().read())
+        except (ConnectionError, OSError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='preforking server needs os.fork')
+def test_serve():
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'yawf', 'serve', 'tests.test_serve:app', '--bind', '127.0.0.1:{}'.format(port),
+         '--workers', '2', '--threads', '2', '--max-requests', '3', '--log-level', 'warning'],
+        cwd=ROOT,
+    )
+
+    try:
+        pids = [get_pid(port) for _ in range(8)]
+        # every worker is recycled after 3 requests
+        assert max(pids.count(pid) for pid in pids) <= 3
+        assert len(set(pids)) >= 3
+
+        server.send_signal(signal.SIGHUP)
+        time.sleep(1)
+        assert get_pid(port) not in pids
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=10) == 0
@@ -0,0 +1,48 @@
+import os
+import sys
+import subprocess
+import http.client
+
+import pytest
+
+from yawf.status import HTTP_STATUSES_STRINGS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules, that only applications using corresponding feature should pay for at start
+LAZY_MODULES = ('asyncio', 'inspect', 'json', 'uuid', 'email', 'http.client', 'ssl', 'pickle', 'typing')
+
+
+def import_times(code: str) -> dict:
+    """
+    Runs code in new interpreter with ``-X importtime``.
+
+    :return: dict of imported module name to cumulative import time in microseconds
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+
+    times = {}
+    for line in result.stderr.decode().splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='-X importtime and lazy module attributes need python 3.7')
+def test_import_is_lazy():
+    times = import_times('import yawf')
+    assert 'yawf' in times and 'yawf.app' in times
+    assert not set(LAZY_MODULES) & set(times)
+
+    # lazy parts are imported by the first use
+    times = import_times('from yawf import AsyncYAWF')
+    assert 'yawf.asgi' in times and 'asyncio' in times
+
+
+def test_status_table():
+    assert set(http.client.responses) <= set(HTTP_STATUSES_STRINGS)
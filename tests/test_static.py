@@ -0,0 +1,105 @@
+import os
+import gzip
+
+import pytest
+
+from yawf import YAWF
+from yawf.router import Router
+from yawf.static import StaticFiles
+
+from ._helpers import call
+
+
+@pytest.fixture
+def static(tmpdir):
+    tmpdir.join('style.css').write(b'body {}')
+    tmpdir.join('app.js').write(b'var a = 1;' * 100)
+    tmpdir.join('app.js.gz').write(gzip.compress(b'var a = 1;' * 100), mode='wb')
+    tmpdir.join('big.bin').write(b'x' * 2000, mode='wb')
+    tmpdir.mkdir('sub').join('index.html').write(b'<html></html>')
+
+    files = StaticFiles(str(tmpdir), max_file_size=1000, max_cache_size=1100, revalidate=60)
+    app = YAWF()
+    files.mount(app.router, '/static')
+    return app, files, tmpdir
+
+
+def test_static_files(static):
+    app, files, tmpdir = static
+
+    start_response, body = call(app, '/static/style.css')
+    assert start_response.status.startswith('200')
+    assert body == b'body {}'
+    assert start_response.headers['Content-Type'] == 'text/css'
+    assert start_response.headers['Content-Length'] == '7'
+    assert 'ETag' in start_response.headers and 'Last-Modified' in start_response.headers
+    assert 'Vary' not in start_response.headers
+
+    assert call(app, '/static/sub/index.html')[1] == b'<html></html>'
+    assert app.url_for('static', path='sub/index.html') == '/static/sub/index.html'
+
+    start_response, body = call(app, '/static/style.css', 'HEAD')
+    assert body == b'' and start_response.headers['Content-Length'] == '7'
+
+    for path in ('/static/missing.css', '/static/../test_static.py', '/static/sub', '/static/sub/../style.css'):
+        assert call(app, path)[0].status.startswith('404')
+
+
+def test_static_conditional(static):
+    app, files, tmpdir = static
+
+    start_response, _ = call(app, '/static/style.css')
+    etag, last_modified = start_response.headers['ETag'], start_response.headers['Last-Modified']
+
+    start_response, body = call(app, '/static/style.css', if_none_match=etag)
+    assert start_response.status.startswith('304') and body == b''
+    assert call(app, '/static/style.css', if_modified_since=last_modified)[0].status.startswith('304')
+    assert call(app, '/static/style.css', if_none_match='"other"')[0].status.startswith('200')
+
+
+def test_static_gzip(static):
+    app, files, tmpdir = static
+
+    start_response, body = call(app, '/static/app.js', accept_encoding='gzip')
+    assert start_response.headers['Content-Encoding'] == 'gzip'
+    assert start_response.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(body) == b'var a = 1;' * 100
+
+    start_response, body = call(app, '/static/app.js', accept_encoding='gzip;q=0')
+    assert 'Content-Encoding' not in start_response.headers
+    assert body == b'var a = 1;' * 100
+
+
+def test_static_cache(static, monkeypatch):
+    app, files, tmpdir = static
+
+    assert call(app, '/static/style.css')[1] == b'body {}'
+    assert call(app, '/static/big.bin', range='bytes=0-9')[1] == b'x' * 10
+
+    # cached file is served without touching file system until revalidation
+    def fail(*args, **kwargs):
+        raise AssertionError('file system was accessed')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(os, 'stat', fail)
+        patch.setattr('builtins.open', fail)
+        assert call(app, '/static/style.css')[1] == b'body {}'
+
+    # memory budget fits only one of small files
+    call(app, '/static/app.js')
+    assert files._cached_bytes <= 1100
+
+    tmpdir.join('style.css').write(b'body { color: red }')
+    os.utime(str(tmpdir.join('style.css')), (1, 1))
+    files.revalidate = 0
+    assert call(app, '/static/style.css')[1] == b'body { color: red }'
+
+
+def test_static_snapshot(static):
+    app, files, tmpdir = static
+    call(app, '/static/style.css')
+
+    app.router = Router.from_snapshot(app.router.snapshot())
+
+    start_response, body = call(app, '/static/style.css')
+    assert body == b'body {}'
@@ -0,0 +1,113 @@
+import time
+import threading
+
+from yawf import AsyncYAWF, YAWF, Response
+from yawf.tasks import TaskQueue
+
+from ._helpers import fake_server, run, start
+
+
+def test_task_queue():
+    tasks = TaskQueue(max_workers=2)
+    done = []
+
+    async def coroutine(value):
+        done.append(value)
+
+    def fail():
+        raise ValueError
+
+    assert tasks.submit(done.append, 1)
+    tasks.submit(coroutine, 2)
+    tasks.submit(fail)
+    tasks.shutdown()
+
+    assert sorted(done) == [1, 2]
+    stats = tasks.stats()
+    assert (stats['completed'], stats['failed'], stats['dropped'], stats['depth']) == (2, 1, 0, 0)
+    assert stats['latency']['count'] == stats['duration']['count'] == 3
+
+    assert not tasks.submit(done.append, 3)
+    assert tasks.dropped == 1
+
+
+def test_task_queue_full():
+    tasks = TaskQueue(max_workers=1, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+    done = []
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    tasks.submit(block)
+    started.wait(5)
+    assert tasks.submit(done.append, 1)
+    assert not tasks.submit(done.append, 2)
+    assert tasks.depth == 1
+
+    release.set()
+    tasks.shutdown()
+    assert done == [1]
+    assert tasks.dropped == 1
+
+
+def test_app_tasks():
+    done = []
+
+    def index(request):
+        request.add_task(done.append, 'request')
+        response = Response('Hello')
+        response.add_task(done.append, 'response')
+        return response
+
+    app = YAWF()
+    app.router.add_get('/', index)
+    app.router.add_get('/plain', lambda request: Response('plain'))
+
+    body = start(app)[1]
+    assert b''.join(body) == b'Hello\n'
+    assert app.tasks.stats()['latency']['count'] == 0
+
+    body.close()
+    app.shutdown()
+    assert done == ['request', 'response']
+
+    # responses without tasks are given to server as is
+    assert start(app, '/plain')[1] == [b'plain\n']
+
+
+def test_asgi_tasks():
+    done = []
+
+    async def index(request):
+        request.add_task(done.append, 'request')
+        return Response('Hello')
+
+    app = AsyncYAWF()
+    app.router.add_get('/', index)
+
+    status, headers, body = run(fake_server(app, 'GET', '/'))
+    assert body == b'Hello\n'
+    app.shutdown()
+    assert done == ['request']
+
+
+def test_task_queue_shutdown_timeout():
+    tasks = TaskQueue(max_workers=1, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    tasks.submit(block)
+    started.wait(5)
+    tasks.submit(block)
+
+    begin = time.monotonic()
+    tasks.shutdown(timeout=0.2)
+    assert time.monotonic() - begin < 1
+    release.set()
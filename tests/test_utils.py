@@ -1,7 +1,52 @@
-from yawf.utils import escape
+import pytest
+
+from yawf.utils import dump_cookie, escape, parse_cookie, parse_range
 
 
 def test_escape():
     assert escape() == ''
     assert escape(['some', 'interesting', 'data']) == "['some', 'interesting', 'data']"
     assert escape('one & two < three') == 'one &amp; two &lt; three'
+
+
+def test_parse_range():
+    assert parse_range(None, 10) is None
+    assert parse_range('bytes=0-4', 10) == (0, 5)
+    assert parse_range('bytes=5-', 10) == (5, 10)
+    assert parse_range('bytes=-3', 10) == (7, 10)
+    assert parse_range('bytes=5-100', 10) == (5, 10)
+    assert parse_range('bytes=0-1,5-6', 10) is None
+    assert parse_range('bytes=5-1', 10) is None
+    assert parse_range('items=0-4', 10) is None
+    assert parse_range('bytes=a-b', 10) is None
+
+    with pytest.raises(ValueError):
+        parse_range('bytes=10-', 10)
+
+    with pytest.raises(ValueError):
+        parse_range('bytes=-0', 10)
+
+
+def test_parse_cookie():
+    assert parse_cookie(None) == {}
+    assert parse_cookie('a=1; token=abc==; b="quoted \\"value\\""; a=2; broken; =x') == \
+        {'a': '1', 'token': 'abc==', 'b': 'quoted "value"'}
+    # header order is kept, cookies already in given dict win
+    assert list(parse_cookie('c=1; b=2; c=3; a=4')) == ['c', 'b', 'a']
+    assert parse_cookie('a=2; b=3', {'a': '1'}) == {'a': '1', 'b': '3'}
+
+
+def test_dump_cookie():
+    assert dump_cookie('user', 'me') == 'user=me; Path=/'
+    assert dump_cookie('user', 'a b;c', path=None) == 'user="a b;c"'
+    assert dump_cookie('sid', 'x', max_age=60, expires=0, domain='example.com', secure=True, httponly=True,
+                       samesite='strict') == \
+        'sid=x; Max-Age=60; Expires=Thu, 01 Jan 1970 00:00:00 GMT; Domain=example.com; Path=/; Secure; ' \
+        'HttpOnly; SameSite=Strict'
+    assert parse_cookie(dump_cookie('b', 'quoted "value"', path=None)) == {'b': 'quoted "value"'}
+
+    with pytest.raises(ValueError):
+        dump_cookie('bad name', 'x')
+
+    with pytest.raises(ValueError):
+        dump_cookie('name', 'x', samesite='sometimes')
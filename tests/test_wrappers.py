@@ -0,0 +1,76 @@
+from io import BytesIO
+from wsgiref.util import FileWrapper
+
+from yawf.wrappers import FileResponse, StreamingResponse
+
+from ._helpers import StartResponse, call
+
+
+def chunks():
+    for i in range(10):
+        yield str(i).encode() * 10
+
+
+def test_streaming_response():
+    start_response, data = call(StreamingResponse(chunks()))
+
+    assert start_response.status == '200 OK'
+    assert 'Content-Length' not in start_response.headers
+    assert start_response.headers['Content-Type'] == 'application/octet-stream'
+    assert data == b''.join(chunks())
+
+
+def test_streaming_response_range():
+    start_response, data = call(StreamingResponse(chunks(), content_length=100), range='bytes=15-34')
+
+    assert start_response.status == '206 Partial Content'
+    assert start_response.headers['Content-Range'] == 'bytes 15-34/100'
+    assert start_response.headers['Content-Length'] == '20'
+    assert data == b''.join(chunks())[15:35]
+
+    start_response, data = call(StreamingResponse(chunks(), content_length=100), range='bytes=100-')
+
+    assert start_response.status == '416 Requested Range Not Satisfiable'
+    assert start_response.headers['Content-Range'] == 'bytes */100'
+    assert data == b''
+
+
+def test_file_response(tmpdir):
+    path = tmpdir.join('data.txt')
+    path.write_binary(b'0123456789' * 1000)
+
+    start_response, data = call(FileResponse(str(path), chunk_size=1024))
+
+    assert start_response.status == '200 OK'
+    assert start_response.headers['Content-Type'] == 'text/plain'
+    assert start_response.headers['Content-Length'] == '10000'
+    assert start_response.headers['Accept-Ranges'] == 'bytes'
+    assert data == path.read_binary()
+
+    response = FileResponse(str(path))
+    body = response({'REQUEST_METHOD': 'GET', 'wsgi.file_wrapper': FileWrapper}, StartResponse())
+
+    assert isinstance(body, FileWrapper)
+    body.close()
+
+
+def test_file_response_range(tmpdir):
+    path = tmpdir.join('data.bin')
+    path.write_binary(bytes(range(256)) * 10)
+
+    start_response, data = call(FileResponse(str(path), chunk_size=100),
+                                range='bytes=-300', environ={'wsgi.file_wrapper': FileWrapper})
+
+    assert start_response.status == '206 Partial Content'
+    assert start_response.headers['Content-Type'] == 'application/octet-stream'
+    assert start_response.headers['Content-Range'] == 'bytes 2260-2559/2560'
+    assert data == path.read_binary()[-300:]
+
+
+def test_file_object_response():
+    file = BytesIO(b'some file content')
+    start_response, data = call(FileResponse(file, content_type='text/plain'), range='bytes=5-8')
+
+    assert start_response.headers['Content-Length'] == '4'
+    assert data == b'file'
+    assert file.closed
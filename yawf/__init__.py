@@ -1,6 +1,19 @@
+import sys
+
 from .app import YAWF
-from .wrappers import Request, Response, Headers
+from .wrappers import Request, Response, StreamingResponse, FileResponse, Headers
 
 __version__ = '0.1.1'
 
-__all__ = ('YAWF', 'Request', 'Response', 'Headers')
+__all__ = ('YAWF', 'AsyncYAWF', 'Request', 'Response', 'StreamingResponse', 'FileResponse', 'Headers')
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        # asgi application pulls in asyncio, so it is imported only by applications using it
+        if name == 'AsyncYAWF':
+            from .asgi import AsyncYAWF
+            return AsyncYAWF
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+else:  # pragma: no cover
+    from .asgi import AsyncYAWF
@@ -0,0 +1,246 @@
+import math
+import time
+import threading
+from collections import OrderedDict, namedtuple
+
+from .errors import ServiceUnavailable, TooManyRequests
+from .wrappers import environ_key
+
+#: routes under path ``prefix``, that share concurrency ``limit`` and ``priority`` class
+Group = namedtuple('Group', ('prefix', 'limit', 'priority'))
+
+
+class ConcurrencyLimit:
+    """
+    Number of requests, that are processed at once.
+
+    Adaptive limit follows observed latency: after every ``window`` requests it is lowered by 10%,
+    if average latency went over ``tolerance`` times the lowest seen one, and raised by one,
+    if requests were rejected while latency stayed low. The lowest latency is measured again
+    every ``relearn`` windows, so limit recovers after workload gets slower for good.
+    """
+
+    def __init__(self, limit: int = 64, adaptive: bool = False, min_limit: int = 1, max_limit: int = None,
+                 tolerance: float = 2.0, window: int = 50, relearn: int = 100):
+        """
+        :param limit: max number of requests in progress, initial one if limit is adaptive
+        :param max_limit: upper bound of adaptive limit, ``limit`` times 10 by default
+        """
+        self.limit = limit
+        self.adaptive = adaptive
+        self.min_limit = min_limit
+        self.max_limit = limit * 10 if max_limit is None else max_limit
+        self.tolerance = tolerance
+        self.window = window
+        self.relearn = relearn
+        self.inflight = 0
+        self.rejected = 0
+
+        self._min_latency = None
+        self._windows = 0
+        self._samples = 0
+        self._total = 0.0
+        self._saturated = False
+        self._lock = threading.Lock()
+
+    def acquire(self, share: float = 1.0) -> bool:
+        """
+        :param share: part of limit, that requests of given priority may take
+        :return: False if limit is reached
+        """
+        with self._lock:
+            if self.inflight >= self.limit * share:
+                self.rejected += 1
+                self._saturated = True
+                return False
+
+            self.inflight += 1
+            return True
+
+    def release(self, latency: float = None):
+        """
+        :param latency: seconds request took, it is not observed if not given
+        """
+        with self._lock:
+            self.inflight -= 1
+            if self.adaptive and latency is not None:
+                self._observe(latency)
+
+    def _observe(self, latency: float):
+        self._samples += 1
+        self._total += latency
+        if self._samples < self.window:
+            return
+
+        average = self._total / self._samples
+        self._samples = 0
+        self._total = 0.0
+        self._windows += 1
+
+        if self._min_latency is None or average < self._min_latency or self._windows >= self.relearn:
+            self._min_latency = average
+            self._windows = 0
+
+        if average > self._min_latency * self.tolerance:
+            self.limit = max(self.min_limit, self.limit * 0.9)
+        elif self._saturated:
+            self.limit = min(self.max_limit, self.limit + 1)
+        self._saturated = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'limit': int(self.limit), 'inflight': self.inflight, 'rejected': self.rejected}
+
+
+class RateLimiter:
+    """
+    Token bucket per client, that lets ``rate`` requests per second with bursts up to ``burst`` requests.
+
+    Clients are told apart by ``REMOTE_ADDR``, value of ``header`` or result of ``key(environ)``.
+    At most ``max_keys`` buckets are kept, the least recently seen client is forgotten and starts
+    with full bucket, when it comes back.
+    """
+
+    def __init__(self, rate: float, burst: int = None, header: str = None, key=None, max_keys: int = 10000):
+        """
+        :param header: name of header, like ``X-Api-Key``, to tell clients apart by
+        :param key: callable taking wsgi environment and returning client key
+        """
+        self.rate = rate
+        self.burst = max(1, math.ceil(rate)) if burst is None else burst
+        self.max_keys = max_keys
+        self.limited = 0
+
+        if key is None:
+            name = 'REMOTE_ADDR' if header is None else environ_key(header)
+
+            def key(environ):
+                return environ.get(name)
+        self.key = key
+
+        # client key to [tokens, time of last update]
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, environ) -> float:
+        """
+        Takes one token from bucket of client.
+
+        :return: 0 if request is allowed, otherwise seconds till token is available
+        """
+        key = self.key(environ)
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.popitem(last=False)
+                bucket = self._buckets[key] = [self.burst, now]
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+
+            self.limited += 1
+            return (1 - bucket[0]) / self.rate
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class AdmissionControl:
+    """
+    Decides, if request is processed or rejected at once, before application spends any work on it.
+
+    Requests over rate limit of client get 429, requests over concurrency limit get 503,
+    both with ``Retry-After`` header and default error page, that is rendered once.
+    Routes may be put in groups by path prefix, every group has its own concurrency limit inside
+    the global one and priority class. Requests of lower priority may take only part of the limit,
+    so under overload they are rejected first::
+
+        admission = AdmissionControl(limit=ConcurrencyLimit(64, adaptive=True),
+                                     rate_limiter=RateLimiter(rate=20, burst=40))
+        admission.add_group('/reports/', limit=4, priority='low')
+        admission.add_group('/health', priority='critical')
+        app = YAWF(admission=admission)
+    """
+
+    #: part of concurrency limit, that requests of priority class may take
+    priorities = {'critical': 1.0, 'normal': 0.9, 'low': 0.5}
+
+    def __init__(self, limit=None, rate_limiter: RateLimiter = None, retry_after: int = 1):
+        """
+        :param limit: global ``ConcurrencyLimit`` or number of requests, None for no limit
+        :param retry_after: seconds to tell clients rejected because of concurrency limit
+        """
+        self.limit = ConcurrencyLimit(limit) if isinstance(limit, int) else limit
+        self.rate_limiter = rate_limiter
+        self.retry_after = retry_after
+        self.default = Group('', None, 'normal')
+        self._groups = []
+
+    def add_group(self, prefix: str, limit=None, priority: str = 'normal') -> Group:
+        """
+        :param prefix: path prefix of routes in group, longer prefixes are matched first
+        :param limit: ``ConcurrencyLimit`` or number of requests of group, None to use only global limit
+        """
+        if priority not in self.priorities:
+            raise ValueError('Unknown priority "{}"'.format(priority))
+
+        group = Group(prefix, ConcurrencyLimit(limit) if isinstance(limit, int) else limit, priority)
+        self._groups.append(group)
+        self._groups.sort(key=lambda group: len(group.prefix), reverse=True)
+        return group
+
+    def find_group(self, path: str) -> Group:
+        for group in self._groups:
+            if path.startswith(group.prefix):
+                return group
+        return self.default
+
+    def priority(self, environ, group: Group) -> str:
+        """
+        :return: priority class of request, override to take it from request itself
+        """
+        return group.priority
+
+    def admit(self, environ) -> tuple:
+        """
+        :return: acquired limits, that have to be given to ``release``, when response is sent
+        :raises TooManyRequests: if client is over rate limit
+        :raises ServiceUnavailable: if concurrency limit of request priority is reached
+        """
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.consume(environ)
+            if wait:
+                raise TooManyRequests(math.ceil(wait))
+
+        group = self.find_group(environ.get('PATH_INFO', ''))
+        share = self.priorities[self.priority(environ, group)]
+
+        # priority shares only the global limit, limit of group is all its own
+        acquired = ()
+        for limit, share in ((group.limit, 1.0), (self.limit, share)):
+            if limit is None:
+                continue
+            if not limit.acquire(share):
+                self.release(acquired)
+                raise ServiceUnavailable(self.retry_after)
+            acquired += (limit,)
+        return acquired
+
+    def release(self, acquired: tuple, latency: float = None):
+        for limit in acquired:
+            limit.release(latency)
+
+    def stats(self) -> dict:
+        return {
+            'limit': self.limit.stats() if self.limit is not None else None,
+            'groups': {group.prefix: group.limit.stats() for group in self._groups if group.limit is not None},
+            'limited': self.rate_limiter.limited if self.rate_limiter is not None else 0,
+        }
@@ -1,54 +1,278 @@
-import sys
-import typing as t
+import time
 import logging
+from collections.abc import Callable
 
+from .codec import default_codec
+from .tasks import TaskQueue
 from .router import Router
 from .wrappers import Request, Response
 from .errors import HttpError, InternalServerError
+from .utils import ClosingIterator, compose
 
 
-logging.basicConfig(
-    format='[%(asctime)s] [%(levelname)s %(module)s] [%(lineno)s] %(message)s',
-    level=logging.ERROR,
-    stream=sys.stderr
-)
 logger = logging.getLogger(__name__)
+access_logger = logging.getLogger('yawf.access')
 
 
 class YAWF:
-    def __init__(self, request_class=Request):
-        self.router = Router()
+    def __init__(self, request_class=Request, route_cache_size: int = 0, access_log: bool = False,
+                 compression=None, json_codec=None, metrics=None, tasks=None, admission=None):
+        """
+        :param access_log: call ``log_access`` once per request
+        :param compression: ``yawf.compression.Compression`` stage applied to responses in ``after_response``
+        :param json_codec: object with ``dumps(obj) -> bytes`` and ``loads(bytes)`` methods,
+                           used for ``Request.json`` and json responses
+        :param metrics: ``yawf.metrics.Metrics`` registry to record phase timings and route stats into
+        :param tasks: ``yawf.tasks.TaskQueue`` running tasks added with ``add_task`` of request and response
+        :param admission: ``yawf.admission.AdmissionControl`` rejecting requests over rate and concurrency limits
+        """
+        self.router = Router(cache_size=route_cache_size)
         self._request_class = request_class
+        self.access_log = access_log
+        self.compression = compression
+        self.json_codec = json_codec or default_codec
+        self.metrics = metrics
+        self.tasks = tasks if tasks is not None else TaskQueue()
+        self.admission = admission
+        self.middleware = []
+        self._pipeline = None
+
+    def use(self, middleware: Callable):
+        """
+        Adds application wide middleware.
+
+        Middleware is a callable, that takes next handler and returns new handler with the same
+        ``(request, **kwargs) -> Response`` signature. First added middleware is the outermost one.
+        """
+        if self._pipeline is not None:
+            raise RuntimeError('Middleware can not be added after application was frozen')
+
+        self.middleware.append(middleware)
+        return middleware
+
+    def freeze(self) -> Callable:
+        """
+        Composes middleware chain into single callable. Called on first request, if not called before.
+        """
+        if self._pipeline is None:
+            dispatch = self.dispatch if self.metrics is None else self._timed_dispatch
+            self._pipeline = compose(self.middleware, dispatch)
+        return self._pipeline
 
     def make_request(self, environment) -> Request:
         environment['app'] = self
         return self._request_class(environment)
 
-    def find_handler(self, request: Request) -> t.Callable:
-        return self.router.search_route(path=request.path, method=request.method)
+    def find_handler(self, request: Request) -> Callable:
+        route, args = self.router.match(path=request.path, method=request.method)
+        request.route = route
+        return route.handler, args
+
+    def url_for(self, endpoint: str, **values) -> str:
+        """
+        Builds url of route registered with ``endpoint`` name, see ``Router.url_for``.
+        """
+        return self.router.url_for(endpoint, **values)
+
+    def dispatch(self, request: Request) -> Response:
+        handler, args = self.find_handler(request)
+        return handler(request, **args)
+
+    def _timed_dispatch(self, request: Request) -> Response:
+        timings = request.env['yawf.timings']
+        clock = time.perf_counter
+
+        started = clock()
+        try:
+            handler, args = self.find_handler(request)
+        finally:
+            found = clock()
+            timings['find_handler'] = found - started
+
+        try:
+            return handler(request, **args)
+        finally:
+            timings['handler'] = clock() - found
 
     def before_response(self, request: Request) -> Request:
         return request
 
     def after_response(self, response: Response) -> Response:
+        if self.compression is not None:
+            return self.compression(response)
+        return response
+
+    def render(self, response: Response) -> Response:
+        """
+        Serializes pending json body of response with application codec, so serialization errors
+        are handled like errors of handler.
+        """
+        if isinstance(response, Response) and response.response is None:
+            response.render(self.json_codec)
         return response
 
     def make_response(self, environment) -> Response:
-        logger.debug('Creating request from wsgi environment')
+        timings = environment.get('yawf.timings')
+        if timings is not None:
+            return self._timed_make_response(environment, timings)
+
+        # level check is cached by logging and reset, when logging is reconfigured
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        if debug:
+            logger.debug('Creating request from wsgi environment')
         request = self.make_request(environment)
 
-        logger.debug('Preprocessing request with before_response method')
+        if debug:
+            logger.debug('Preprocessing request with before_response method')
         request = self.before_response(request)
 
-        handler, args = self.find_handler(request)
-        response = handler(request, **args)
+        response = self.render((self._pipeline or self.freeze())(request))
+
+        if debug:
+            logger.debug('Postprocessing response with after_response method')
+        response = self.after_response(response)
+
+        return response
+
+    def _timed_make_response(self, environment, timings: dict) -> Response:
+        clock = time.perf_counter
+
+        started = clock()
+        request = self.make_request(environment)
+        now = clock()
+        timings['make_request'] = now - started
+
+        request = self.before_response(request)
+        started = clock()
+        timings['before_response'] = started - now
+
+        try:
+            response = self.render((self._pipeline or self.freeze())(request))
+        finally:
+            environment['yawf.route'] = request.route
 
-        logger.debug('Postprocessing response with after_response method')
+        now = clock()
         response = self.after_response(response)
+        timings['after_response'] = clock() - now
 
         return response
 
+    def log_access(self, environment, status: int, length: int, duration: float):
+        """
+        Called once per request, when access log is enabled and response is sent.
+
+        :param length: number of body bytes sent
+        :param duration: seconds from start of request till response body was closed
+        """
+        if access_logger.isEnabledFor(logging.INFO):
+            method, path = environment.get('REQUEST_METHOD'), environment.get('PATH_INFO')
+            access_logger.info('%s %s %s %s %.2fms', method, path, status, length, duration * 1000, extra={
+                'method': method, 'path': path, 'status': status, 'bytes': length, 'duration': duration,
+            })
+
+    def record_metrics(self, environment, status: int, duration: float):
+        """
+        Called once per request, when metrics are enabled and response is sent.
+        """
+        timings = environment['yawf.timings']
+        timings['write'] = max(0.0, duration - sum(timings.values()))
+        timings['total'] = duration
+        self.metrics.record(environment, environment.get('yawf.route'), status, timings)
+
     def __call__(self, environment, start_response):
+        if self.access_log or self.metrics is not None:
+            return self._observed_call(environment, start_response)
+
+        if self.admission is not None:
+            return self._admitted_call(environment, start_response)
+
+        return self.wsgi_app(environment, start_response)
+
+    def _observed_call(self, environment, start_response):
+        if self.metrics is not None:
+            environment['yawf.timings'] = {}
+
+        clock = time.perf_counter
+        started = clock()
+        sent = []
+
+        def observed_start_response(status, headers, exc_info=None):
+            sent[:] = status, headers
+            return start_response(status, headers, exc_info)
+
+        call = self.wsgi_app if self.admission is None else self._admitted_call
+        body = call(environment, observed_start_response)
+        status, headers = sent
+        status = int(status[:3])
+
+        if isinstance(body, (list, tuple)):
+            self._finish(environment, status, sum(len(chunk) for chunk in body), clock() - started)
+            return body
+
+        file_wrapper = environment.get('wsgi.file_wrapper')
+        if isinstance(file_wrapper, type) and isinstance(body, file_wrapper):
+            # wrapped file would not reach server's sendfile, so size is taken from headers
+            length = next((int(val) for name, val in headers if name.lower() == 'content-length'), 0)
+            self._finish(environment, status, length, clock() - started)
+            return body
+
+        def on_close(iterator):
+            self._finish(environment, status, iterator.sent, clock() - started)
+
+        return ClosingIterator(body, [on_close])
+
+    def _admitted_call(self, environment, start_response):
+        admission = self.admission
+        clock = time.perf_counter
+        started = clock()
+
+        try:
+            acquired = admission.admit(environment)
+        except HttpError as error:
+            # rejected request costs no more than sending prerendered error page
+            return error(environment, start_response)
+
+        try:
+            body = self.wsgi_app(environment, start_response)
+        except BaseException:
+            admission.release(acquired)
+            raise
+
+        file_wrapper = environment.get('wsgi.file_wrapper')
+        if isinstance(body, (list, tuple)) or isinstance(file_wrapper, type) and isinstance(body, file_wrapper):
+            # body is ready or is sent by server with sendfile, so request needs no more application work
+            admission.release(acquired, clock() - started)
+            return body
+
+        def on_close(iterator):
+            admission.release(acquired, clock() - started)
+
+        return ClosingIterator(body, [on_close])
+
+    def _finish(self, environment, status: int, length: int, duration: float):
+        if self.access_log:
+            self.log_access(environment, status, length, duration)
+        if self.metrics is not None:
+            self.record_metrics(environment, status, duration)
+
+    def collect_tasks(self, environment, response) -> list:
+        """
+        :return: background tasks added to request and response, None if there are none
+        """
+        tasks = environment.get('yawf.tasks')
+        response_tasks = getattr(response, 'tasks', None)
+        if response_tasks:
+            tasks = tasks + response_tasks if tasks else response_tasks
+        return tasks
+
+    def shutdown(self, timeout: float = None):
+        """
+        Waits for queued background tasks, called by server on exit.
+        """
+        self.tasks.shutdown(timeout)
+
+    def wsgi_app(self, environment, start_response):
         try:
             response = self.make_response(environment)
         except HttpError as error:
@@ -57,4 +281,10 @@ class YAWF:
             logger.exception('Unknown error', exc_info=True)
             response = InternalServerError()
         finally:
-            return response(environment, start_response)
+            body = response(environment, start_response)
+            tasks = self.collect_tasks(environment, response)
+            if not tasks:
+                return body
+
+            # tasks are run, when server closes body after sending it
+            return ClosingIterator(body, [lambda iterator: self.tasks.submit_all(tasks)])
@@ -0,0 +1,272 @@
+import time
+import asyncio
+import inspect
+import logging
+import functools
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+
+from .app import YAWF
+from .errors import HttpError, InternalServerError, RequestEntityTooLarge
+from .wrappers import Request, Response
+
+
+logger = logging.getLogger(__name__)
+
+
+class ClientDisconnected(Exception):
+    """
+    Thrown if client closed connection before request body was received
+    """
+
+
+def scope_to_environ(scope: dict) -> dict:
+    """
+    Makes wsgi like environment from asgi http connection scope.
+    """
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_PROTOCOL': 'HTTP/{}'.format(scope.get('http_version', '1.1')),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(),
+        'asgi.scope': scope,
+    }
+
+    server = scope.get('server')
+    if server:
+        environ['SERVER_NAME'], environ['SERVER_PORT'] = server[0], str(server[1])
+
+    client = scope.get('client')
+    if client:
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = client[0], str(client[1])
+
+    for name, value in scope.get('headers', ()):
+        key = name.decode('latin-1').upper().replace('-', '_')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = 'HTTP_' + key
+
+        value = value.decode('latin-1')
+        if key in environ:
+            # http/2 sends cookies as separate fields, they are joined back like http/1.1 does
+            value = environ[key] + ('; ' if key == 'HTTP_COOKIE' else ',') + value
+        environ[key] = value
+
+    return environ
+
+
+class BodyStream:
+    """
+    Async iterator over request body chunks received from asgi ``receive`` callable.
+    """
+
+    def __init__(self, request: 'ASGIRequest'):
+        self.request = request
+        self._done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        request = self.request
+        if self._done:
+            raise StopAsyncIteration
+
+        if request._content is not None:
+            # body was already received as a whole, give it away at once
+            self._done = True
+            if request._content:
+                return request._content
+            raise StopAsyncIteration
+
+        while not request._received:
+            message = await request.env['asgi.receive']()
+            if message['type'] == 'http.disconnect':
+                raise ClientDisconnected
+
+            request._received = not message.get('more_body', False)
+            chunk = message.get('body', b'')
+            if chunk:
+                request._count(len(chunk))
+                return chunk
+
+        self._done = True
+        raise StopAsyncIteration
+
+
+class ASGIRequest(Request):
+    """
+    Request, that receives body from asgi ``receive`` callable.
+
+    Body is available either as async stream of chunks with ``stream()``,
+    or as a whole with ``await body()``, after which sync ``content``, ``text``
+    and ``json`` attributes work too.
+    """
+    __slots__ = ('_received',)
+
+    def __init__(self, environment):
+        Request.__init__(self, environment)
+        self._received = False
+
+    def stream(self) -> BodyStream:
+        length = self.content_length
+        if self.max_content_length is not None and length is not None and length > self.max_content_length:
+            raise RequestEntityTooLarge
+
+        return BodyStream(self)
+
+    async def body(self) -> bytes:
+        if self._content is None:
+            if self._received:
+                raise RuntimeError('Request body was already consumed with stream()')
+
+            chunks = []
+            async for chunk in self.stream():
+                chunks.append(chunk)
+            self._content = b''.join(chunks)
+
+        return self._content
+
+    @property
+    def content(self):
+        if self._content is None:
+            raise RuntimeError('Request body is not received yet, use "await request.body()"')
+
+        return self._content
+
+
+async def _maybe_await(value):
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+class AsyncYAWF(YAWF):
+    """
+    YAWF application speaking ASGI 3.
+
+    Handlers and ``before_response``/``after_response`` hooks may be coroutine functions.
+    Sync handlers receive the whole request body and run in a bounded thread pool.
+    Application wide middleware wraps coroutine ``dispatch``, so its handlers have to be awaited,
+    and application has no wsgi entry point, sync applications use ``YAWF``.
+    """
+
+    def __init__(self, request_class=ASGIRequest, route_cache_size: int = 0, compression=None,
+                 json_codec=None, max_workers: int = None, tasks=None, admission=None):
+        YAWF.__init__(self, request_class=request_class, route_cache_size=route_cache_size,
+                      compression=compression, json_codec=json_codec, tasks=tasks, admission=admission)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    async def call_handler(self, handler, request: Request, args: dict):
+        if asyncio.iscoroutinefunction(handler):
+            return await handler(request, **args)
+
+        await request.body()
+        loop = asyncio.get_event_loop()
+        response = await loop.run_in_executor(self.executor, functools.partial(handler, request, **args))
+        return await _maybe_await(response)
+
+    async def dispatch(self, request: Request) -> Response:
+        handler, args = self.find_handler(request)
+        return await self.call_handler(handler, request, args)
+
+    async def make_response_async(self, environment) -> Response:
+        request = self.make_request(environment)
+        request = await _maybe_await(self.before_response(request))
+
+        response = self.render(await _maybe_await((self._pipeline or self.freeze())(request)))
+
+        return await _maybe_await(self.after_response(response))
+
+    async def send_response(self, response, environment, send):
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = status, headers
+
+        body = response(environment, start_response)
+        status, headers = started
+
+        await send({
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin-1'), str(value).encode('latin-1')) for name, value in headers],
+        })
+
+        try:
+            if isinstance(body, (list, tuple)):
+                for chunk in body:
+                    if chunk:
+                        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            else:
+                loop = asyncio.get_event_loop()
+                iterator, done = iter(body), object()
+                while True:
+                    chunk = await loop.run_in_executor(self.executor, next, iterator, done)
+                    if chunk is done:
+                        break
+                    if chunk:
+                        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            close = getattr(body, 'close', None)
+            if close is not None:
+                close()
+
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                # queued background tasks are drained without blocking event loop
+                await asyncio.get_event_loop().run_in_executor(None, self.shutdown)
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+
+        if scope['type'] != 'http':
+            raise ValueError('Unsupported asgi scope type "{}"'.format(scope['type']))
+
+        environment = scope_to_environ(scope)
+        environment['asgi.receive'] = receive
+
+        if self.admission is None:
+            await self.respond(environment, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            acquired = self.admission.admit(environment)
+        except HttpError as error:
+            await self.send_response(error, environment, send)
+            return
+
+        try:
+            await self.respond(environment, send)
+        finally:
+            self.admission.release(acquired, time.perf_counter() - started)
+
+    async def respond(self, environment, send):
+        try:
+            response = await self.make_response_async(environment)
+        except ClientDisconnected:
+            return
+        except HttpError as error:
+            response = error
+        except Exception:
+            logger.exception('Unknown error', exc_info=True)
+            response = InternalServerError()
+
+        await self.send_response(response, environment, send)
+
+        tasks = self.collect_tasks(environment, response)
+        if tasks:
+            self.tasks.submit_all(tasks)
@@ -0,0 +1,233 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+from .wrappers import Response, environ_key
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'size', 'bytes', 'max_bytes'))
+
+CACHEABLE_METHODS = ('GET', 'HEAD')
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """
+    Weak comparison of ``If-None-Match`` header with entity tag.
+    """
+    if header.strip() == '*':
+        return True
+
+    etag = etag[2:] if etag.startswith('W/') else etag
+    for item in header.split(','):
+        item = item.strip()
+        if item.startswith('W/'):
+            item = item[2:]
+        if item == etag:
+            return True
+    return False
+
+
+class CachedResponse:
+    """
+    Rendered response kept by ``ResponseCache``, it is sent as is on every hit.
+    """
+    __slots__ = ('status', 'headers', 'body', 'etag', 'size', 'expires')
+
+    def __init__(self, status: str, headers: list, body: bytes, etag: str, expires: float):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.expires = expires
+        self.size = len(body) + sum(len(name) + len(value) for name, value in headers)
+
+    def __call__(self, environment, start_response):
+        start_response(self.status, list(self.headers))
+        return [self.body]
+
+
+class ResponseCache:
+    """
+    In memory cache of rendered GET and HEAD responses.
+
+    Entries expire after ``ttl`` seconds and least recently used ones are evicted, when size of
+    cached bodies and headers goes over ``max_bytes``. Cached responses get strong ETag made of body hash,
+    requests with matching ``If-None-Match`` get 304 without calling handler. Only one request
+    per key calls handler, while others wait for its response.
+
+    Cache is applied per route as middleware::
+
+        cache = ResponseCache(max_bytes=64 * 1024 * 1024)
+        app.router.add_get('/items', items, middleware=[cache.cached(args=('page',), ttl=30)])
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, ttl: float = 60.0, max_entry_size: int = None):
+        """
+        :param ttl: default seconds to keep response for
+        :param max_entry_size: responses bigger than this are not cached, ``max_bytes`` by default
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_size = max_bytes if max_entry_size is None else max_entry_size
+        self.bytes = 0
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # keys, which responses are being made, to events set when they are done
+        self._filling = {}
+
+    def cached(self, args=None, vary=(), ttl: float = None):
+        """
+        Makes middleware, that caches responses of wrapped handler.
+
+        :param args: names of query arguments, that make cache key, None means whole query string
+        :param vary: names of request headers, that make cache key, they are added to Vary response header
+        :param ttl: seconds to keep response for, cache default if not given
+        """
+        vary = tuple(vary)
+        vary_keys = tuple(environ_key(name) for name in vary)
+        ttl = self.ttl if ttl is None else ttl
+
+        def middleware(handler):
+            def cached_handler(request, **kwargs):
+                env = request.env
+                method = env['REQUEST_METHOD']
+                if method not in CACHEABLE_METHODS:
+                    return handler(request, **kwargs)
+
+                if args is None:
+                    query = env.get('QUERY_STRING', '')
+                else:
+                    query = tuple(tuple(request.args.getlist(name)) for name in args)
+                key = method, env['PATH_INFO'], query, tuple(env.get(name) for name in vary_keys)
+
+                entry = self.get(key)
+                if entry is None:
+                    entry, response = self._fill(key, handler, request, kwargs, vary, ttl)
+                    if entry is None:
+                        return response
+                    if response is not None and response.tasks:
+                        # cache entry is sent in place of response, so its tasks go with request
+                        env.setdefault('yawf.tasks', []).extend(response.tasks)
+
+                if_none_match = env.get('HTTP_IF_NONE_MATCH')
+                if if_none_match and etag_matches(if_none_match, entry.etag):
+                    headers = [(name, value) for name, value in entry.headers
+                               if name.lower() in ('etag', 'vary', 'cache-control', 'last-modified')]
+                    return Response(headers=headers, status=304)
+
+                return entry
+
+            return cached_handler
+
+        return middleware
+
+    def _fill(self, key, handler, request, kwargs, vary, ttl):
+        """
+        Calls handler once per key, concurrent requests for the same key wait for its result.
+        If response was not stored, waiting requests call handler on their own at once.
+
+        :return: tuple of cache entry and response, entry is None if response can not be cached
+        """
+        with self._lock:
+            done = self._filling.get(key)
+            if done is None:
+                done = self._filling[key] = threading.Event()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            done.wait()
+            entry = self.get(key, count=False)
+            if entry is not None:
+                return entry, None
+
+            response = handler(request, **kwargs)
+            return self.store(key, response, request.env, vary, ttl), response
+
+        try:
+            response = handler(request, **kwargs)
+            entry = self.store(key, response, request.env, vary, ttl)
+            return entry, response
+        finally:
+            with self._lock:
+                self._filling.pop(key, None)
+            done.set()
+
+    def get(self, key, count: bool = True):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry
+
+    def store(self, key, response, environment, vary=(), ttl: float = None):
+        """
+        Renders and keeps response with 200 status and body given as bytes chunks or json payload.
+
+        :return: cache entry, None if response can not be cached
+        """
+        if not isinstance(response, Response) or response.status != 200 \
+                or not (response.response is None or isinstance(response.response, (list, tuple))):
+            # streamed bodies are sent as is
+            return None
+
+        sent = []
+
+        def capture(status, headers, exc_info=None):
+            sent[:] = status, headers
+
+        body = response(environment, capture)
+        status, headers = sent
+        names = {name.lower() for name, _ in headers}
+        if 'set-cookie' in names:
+            return None
+
+        body = b''.join(body)
+        headers = list(headers)
+        if 'etag' in names:
+            etag = next(value for name, value in headers if name.lower() == 'etag')
+        else:
+            etag = '"{}"'.format(hashlib.sha1(body).hexdigest())
+            headers.append(('ETag', etag))
+
+        if vary and 'vary' not in names:
+            headers.append(('Vary', ', '.join(vary)))
+
+        entry = CachedResponse(status, headers, body, etag, time.monotonic() + (self.ttl if ttl is None else ttl))
+        if entry.size > self.max_entry_size:
+            return entry
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.bytes += entry.size
+
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+        return entry
+
+    def _remove(self, key):
+        self.bytes -= self._entries.pop(key).size
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, len(self._entries), self.bytes, self.max_bytes)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = self.misses = 0
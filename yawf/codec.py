@@ -0,0 +1,86 @@
+_BOMS = (b'\xef\xbb\xbf', b'\xff\xfe', b'\xfe\xff')
+
+
+def detect_encoding(data: bytes) -> str:
+    """
+    Detects encoding of json text by byte order mark or by zero bytes of first ascii characters,
+    like ``json.detect_encoding``, that python 3.5 does not have.
+    """
+    if data.startswith((b'\x00\x00\xfe\xff', b'\xff\xfe\x00\x00')):
+        return 'utf-32'
+    if data.startswith((b'\xfe\xff', b'\xff\xfe')):
+        return 'utf-16'
+    if data.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+
+    if len(data) >= 4:
+        if not data[0]:
+            return 'utf-16-be' if data[1] else 'utf-32-be'
+        if not data[1]:
+            return 'utf-16-le' if data[2] or data[3] else 'utf-32-le'
+    elif len(data) == 2:
+        if not data[0]:
+            return 'utf-16-be'
+        if not data[1]:
+            return 'utf-16-le'
+    return 'utf-8'
+
+
+class JSONCodec:
+    """
+    Default json codec based on stdlib json module.
+
+    Encoder is created once with compact separators and reused, so every call goes straight
+    to C accelerated encoder; both methods work with bytes. Json module is imported on first use,
+    so applications without json bodies do not pay for it at start.
+    """
+
+    def __init__(self):
+        self._json = self._encoder = self._decoder = None
+
+    def _load(self):
+        import json
+        self._encoder = json.JSONEncoder(separators=(',', ':'))
+        self._decoder = json.JSONDecoder()
+        self._json = json
+
+    def dumps(self, obj) -> bytes:
+        if self._json is None:
+            self._load()
+        # encoder escapes non ascii characters, so encoding to utf-8 is plain copy
+        return self._encoder.encode(obj).encode('utf-8')
+
+    def loads(self, data: bytes):
+        if self._json is None:
+            self._load()
+
+        if not isinstance(data, str):
+            if not isinstance(data, bytes):
+                data = bytes(data)
+
+            if b'\x00' in data[:4] or data.startswith(_BOMS):
+                # utf-16 or utf-32 body, or utf-8 one with byte order mark
+                data = data.decode(detect_encoding(data), 'surrogatepass')
+            else:
+                data = data.decode('utf-8', 'surrogatepass')
+
+        return self._decoder.decode(data)
+
+
+class OrjsonCodec:
+    """
+    Codec based on third party ``orjson`` package, that serializes straight to bytes.
+    """
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def loads(self, data: bytes):
+        return self._orjson.loads(data)
+
+
+default_codec = JSONCodec()
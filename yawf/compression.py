@@ -0,0 +1,200 @@
+import zlib
+import threading
+from collections import OrderedDict
+
+from .wrappers import Response
+
+# wbits of zlib compressor for every supported content coding
+ENCODINGS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS,
+}
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(';', 1)[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith(('+json', '+xml'))
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """
+    :return: dict of content codings to their quality values
+    """
+    codings = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        q = 1.0
+        name, _, value = params.partition('=')
+        if name.strip() == 'q':
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        codings[coding] = q
+
+    return codings
+
+
+class Compression:
+    """
+    Response compression stage, that is applied in ``YAWF.after_response``.
+
+    Body is compressed with stdlib zlib, if client accepts gzip or deflate coding, content type is
+    compressible and body is not smaller than ``min_size``. Bodies given as list are compressed at once and
+    get proper Content-Length, other iterables are compressed chunk by chunk while server sends them.
+    """
+
+    def __init__(self, min_size: int = 500, level: int = 6, encodings=('gzip', 'deflate'),
+                 cache_size: int = 0, max_cached_size: int = 64 * 1024):
+        """
+        :param encodings: supported content codings in order of preference
+        :param cache_size: number of compressed bodies to keep for responses with the same body, 0 disables cache
+        :param max_cached_size: max size of body to keep compressed copy of
+        """
+        unknown = set(encodings) - set(ENCODINGS)
+        if unknown:
+            raise ValueError('Unsupported content codings: {}'.format(', '.join(sorted(unknown))))
+
+        self.min_size = min_size
+        self.level = level
+        self.encodings = tuple(encodings)
+        self.cache_size = cache_size
+        self.max_cached_size = max_cached_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def __call__(self, response: Response) -> 'CompressedResponse':
+        return CompressedResponse(response, self)
+
+    def negotiate(self, environ) -> str:
+        """
+        :return: content coding preferred by client, None if body should be sent as is
+        """
+        header = environ.get('HTTP_ACCEPT_ENCODING')
+        if not header:
+            return None
+
+        codings = parse_accept_encoding(header)
+        best, best_q = None, 0.0
+        for encoding in self.encodings:
+            q = codings.get(encoding, codings.get('*', 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+
+        return best
+
+    def compressor(self, encoding: str):
+        return zlib.compressobj(self.level, zlib.DEFLATED, ENCODINGS[encoding])
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        cacheable = self.cache_size and len(data) <= self.max_cached_size
+        if cacheable:
+            key = encoding, data
+            with self._cache_lock:
+                compressed = self._cache.get(key)
+                if compressed is not None:
+                    self._cache.move_to_end(key)
+                    return compressed
+
+        compressor = self.compressor(encoding)
+        compressed = compressor.compress(data) + compressor.flush()
+
+        if cacheable:
+            with self._cache_lock:
+                self._cache[key] = compressed
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return compressed
+
+    def compress_iter(self, iterable, encoding: str):
+        compressor = self.compressor(encoding)
+        try:
+            for chunk in iterable:
+                chunk = compressor.compress(chunk)
+                if chunk:
+                    yield chunk
+            yield compressor.flush()
+        finally:
+            close = getattr(iterable, 'close', None)
+            if close is not None:
+                close()
+
+
+class CompressedResponse:
+    """
+    Wraps response and compresses its body according to request ``Accept-Encoding`` header.
+    """
+    __slots__ = ('response', 'compression')
+
+    def __init__(self, response: Response, compression: Compression):
+        self.response = response
+        self.compression = compression
+
+    def __getattr__(self, item):
+        return getattr(self.response, item)
+
+    def __call__(self, environment, start_response):
+        sent = []
+
+        def capture(status, headers, exc_info=None):
+            sent[:] = status, headers
+
+        body = self.response(environment, capture)
+        status, headers = sent
+
+        content_type = content_length = vary = None
+        encoded = False
+        for name, val in headers:
+            name = name.lower()
+            if name == 'content-type':
+                content_type = val
+            elif name == 'content-length':
+                content_length = int(val)
+            elif name == 'vary':
+                vary = val.lower()
+            elif name == 'content-encoding':
+                encoded = True
+
+        if encoded or not status.startswith('200') or content_type is None or not is_compressible(content_type):
+            start_response(status, headers)
+            return body
+
+        if vary is None or 'accept-encoding' not in vary:
+            headers = headers + [('Vary', 'Accept-Encoding')]
+
+        compression = self.compression
+        encoding = compression.negotiate(environment)
+        file_wrapper = environment.get('wsgi.file_wrapper')
+        if encoding is None or content_length is not None and content_length < compression.min_size \
+                or isinstance(file_wrapper, type) and isinstance(body, file_wrapper):
+            start_response(status, headers)
+            return body
+
+        if isinstance(body, (list, tuple)):
+            data = b''.join(body)
+            if len(data) < compression.min_size:
+                start_response(status, headers)
+                return body
+            body = [compression.compress(data, encoding)]
+        else:
+            body = compression.compress_iter(body, encoding)
+
+        # compressed body is other representation, so strong entity tag of identity body is made weak,
+        # weak comparison of If-None-Match upstream still matches it
+        headers = [
+            (name, 'W/' + val if name.lower() == 'etag' and not val.startswith('W/') else val)
+            for name, val in headers if name.lower() != 'content-length'
+        ]
+        headers.append(('Content-Encoding', encoding))
+        if isinstance(body, list):
+            headers.append(('Content-Length', str(len(body[0]))))
+
+        start_response(status, headers)
+        return body
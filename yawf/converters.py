@@ -0,0 +1,84 @@
+from urllib.parse import quote
+
+
+class BaseConverter:
+    """
+    Converter of one ``<type:name>`` variable of route template.
+
+    ``regex`` is put into compiled route pattern, ``to_python`` makes handler argument from matched string
+    and ``to_url`` makes url part from value given to ``url_for``.
+    """
+    __slots__ = ()
+
+    regex = '[^/]+'
+    # converters, that return matched string as is, are skipped while building handler arguments
+    identity = True
+
+    def to_python(self, value: str):
+        return value
+
+    def to_url(self, value) -> str:
+        return quote(str(value), safe='')
+
+
+class StringConverter(BaseConverter):
+    __slots__ = ()
+
+
+class PathConverter(BaseConverter):
+    __slots__ = ()
+
+    regex = '[^/].*?'
+
+    def to_url(self, value) -> str:
+        return quote(str(value), safe='/')
+
+
+class IntConverter(BaseConverter):
+    __slots__ = ()
+
+    regex = r'\d+'
+    identity = False
+
+    def to_python(self, value: str) -> int:
+        return int(value)
+
+    def to_url(self, value) -> str:
+        return str(int(value))
+
+
+class FloatConverter(BaseConverter):
+    __slots__ = ()
+
+    regex = r'\d+\.\d+'
+    identity = False
+
+    def to_python(self, value: str) -> float:
+        return float(value)
+
+    def to_url(self, value) -> str:
+        return repr(float(value))
+
+
+class UUIDConverter(BaseConverter):
+    __slots__ = ()
+
+    regex = '[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+    identity = False
+
+    def to_python(self, value: str) -> 'uuid.UUID':
+        # uuid module is imported on first matched value, applications seldom need it
+        from uuid import UUID
+        return UUID(value)
+
+    def to_url(self, value) -> str:
+        return str(value)
+
+
+DEFAULT_CONVERTERS = {
+    'str': StringConverter(),
+    'path': PathConverter(),
+    'int': IntConverter(),
+    'float': FloatConverter(),
+    'uuid': UUIDConverter(),
+}
@@ -1,3 +1,5 @@
+import functools
+
 from .wrappers import HTTP_STATUSES_STRINGS, Response
 from .utils import escape
 
@@ -9,8 +11,47 @@ err_template = """\
 {description}
 """
 
+# (error class, json flag) -> (status, headers, body) of default error response, False if class renders itself
+_rendered = {}
+
+
+@functools.lru_cache(maxsize=64)
+def prefers_json(accept: str) -> bool:
+    """
+    :return: True if ``Accept`` header value rates json above html
+    """
+    if not accept or 'json' not in accept:
+        return False
+
+    json_q = html_q = 0.0
+    for item in accept.split(','):
+        media_type, _, params = item.partition(';')
+        media_type = media_type.strip()
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+
+        if media_type == 'application/json' or media_type.endswith('+json'):
+            json_q = max(json_q, q)
+        elif media_type in ('text/html', 'text/*', '*/*'):
+            html_q = max(html_q, q)
+
+    return json_q > html_q
+
+
+def _wants_json(environ) -> bool:
+    return environ is not None and prefers_json(environ.get('HTTP_ACCEPT'))
+
 
 class HttpError(Exception):
+    # exceptions always have instance dict, slots only keep fixed attributes out of it
+    __slots__ = ('response',)
+
     code = None
     description = None
 
@@ -29,6 +70,10 @@ class HttpError(Exception):
         return '<p>{}</p>'.format(escape(self.description))
 
     def get_body(self, environ):
+        if _wants_json(environ):
+            import json
+            return json.dumps({'code': self.code, 'name': self.name, 'description': self.description})
+
         return err_template.format(
                 code=self.code,
                 name=escape(self.name),
@@ -36,29 +81,67 @@ class HttpError(Exception):
             )
 
     def get_headers(self, environ=None):
-        return [('Content-type', 'text/html')]
+        # body is negotiated by Accept header, so shared caches have to keep both variants
+        if _wants_json(environ):
+            return [('Content-Type', 'application/json'), ('Vary', 'Accept')]
+        return [('Content-Type', 'text/html'), ('Vary', 'Accept')]
 
     def get_response(self, environ):
         if self.response is not None:  # pragma: no cover
             return self.response
 
-        h = self.get_headers(environ)
-        b = self.get_body(environ)
-        return Response(b, headers=h, status=self.code)
+        body = self.get_body(environ).encode()
+        response = Response(headers=self.get_headers(environ), status=self.code)
+        response.response = [body]
+        response.add_header('Content-Length', str(len(body)))
+        return response
+
+    @classmethod
+    def _renders_default(cls) -> bool:
+        return all(getattr(cls, name) is getattr(HttpError, name)
+                   for name in ('get_description', 'get_body', 'get_headers', 'get_response'))
 
     def __call__(self, environ, start_response):
+        if self.response is None and 'description' not in self.__dict__:
+            # default error page depends only on class and negotiated content type, so it is rendered once
+            key = type(self), _wants_json(environ)
+            rendered = _rendered.get(key)
+            if rendered is None:
+                if self._renders_default():
+                    response = self.get_response(environ)
+                    rendered = response.make_status_str(), tuple(response.make_headers()), response.response[0]
+                else:
+                    rendered = False
+                _rendered[key] = rendered
+
+            if rendered:
+                status, headers, body = rendered
+                start_response(status, list(headers))
+                return [body]
+
         response = self.get_response(environ)
         return response(environ, start_response)
 
     def __repr__(self):  # pragma: no cover
+        attrs = [(name, getattr(self, name)) for cls in type(self).__mro__
+                 for name in getattr(cls, '__slots__', ()) if hasattr(self, name)]
         return '{name}({args})'\
             .format(name=self.__class__.__name__,
-                    args=', '.join(['{}="{}"'.format(key, val) for key, val in self.__dict__.items()]))
+                    args=', '.join(['{}="{}"'.format(key, val) for key, val in attrs + list(self.__dict__.items())]))
 
     __str__ = __repr__
 
 
+class BadRequest(HttpError):
+    __slots__ = ()
+
+    code = 400
+    description = 'The browser (or proxy) sent a request that this server could not understand.'
+
+
 class NotFound(HttpError):
+    __slots__ = ('path',)
+
     code = 404
     description = 'The requested URL was not found on the server.'
 
@@ -68,10 +151,61 @@ class NotFound(HttpError):
 
 
 class MethodNotAllowed(HttpError):
+    __slots__ = ()
+
     code = 405
     description = 'The method is not allowed for the requested URL.'
 
 
+class RequestEntityTooLarge(HttpError):
+    __slots__ = ()
+
+    code = 413
+    description = 'The data value transmitted exceeds the capacity limit.'
+
+
 class InternalServerError(HttpError):
+    __slots__ = ()
+
     code = 500
     description = 'The server encountered an internal error and was unable to complete your request.'
+
+
+class _RetryAfter:
+    """
+    Adds ``Retry-After`` header to default error page, which stays rendered once per class.
+    """
+    __slots__ = ()
+
+    def __call__(self, environ, start_response):
+        if self.retry_after is None:
+            return HttpError.__call__(self, environ, start_response)
+
+        def retry_start_response(status, headers, exc_info=None):
+            headers.append(('Retry-After', str(self.retry_after)))
+            return start_response(status, headers, exc_info)
+
+        return HttpError.__call__(self, environ, retry_start_response)
+
+
+class TooManyRequests(_RetryAfter, HttpError):
+    __slots__ = ('retry_after',)
+
+    code = 429
+    description = 'The user has sent too many requests in a given amount of time.'
+
+    def __init__(self, retry_after: int = None, *args, **kwargs):
+        HttpError.__init__(self, *args, **kwargs)
+        self.retry_after = retry_after
+
+
+class ServiceUnavailable(_RetryAfter, HttpError):
+    __slots__ = ('retry_after',)
+
+    code = 503
+    description = 'The server is temporarily unable to service your request due to overload. ' \
+                  'Please try again later.'
+
+    def __init__(self, retry_after: int = None, *args, **kwargs):
+        HttpError.__init__(self, *args, **kwargs)
+        self.retry_after = retry_after
@@ -0,0 +1,279 @@
+import re
+import shutil
+from tempfile import SpooledTemporaryFile
+from urllib.parse import parse_qsl, unquote
+
+from .errors import BadRequest, RequestEntityTooLarge
+from .wrappers import MultiDict
+
+_OPTION = re.compile(r';\s*([\w!#$%&\'*+.^`|~-]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^;]*)')
+
+
+def parse_options_header(value: str):
+    """
+    Parses header like ``form-data; name="file"; filename="a.txt"``.
+
+    :return: tuple of header value and dict of its lower cased options
+    """
+    if not value:
+        return '', {}
+
+    main, _, rest = value.partition(';')
+    options = {}
+    for match in _OPTION.finditer(';' + rest):
+        name, option = match.group(1).lower(), match.group(2).strip()
+        if option.startswith('"') and option.endswith('"') and len(option) > 1:
+            option = re.sub(r'\\(.)', r'\1', option[1:-1])
+        if name.endswith('*'):
+            # extended notation of rfc 5987, like utf-8''%E2%82%AC.txt
+            charset, _, option = option.partition("'")
+            _, _, option = option.partition("'")
+            name, option = name[:-1], unquote(option, encoding=charset or 'utf-8', errors='replace')
+        options[name] = option
+
+    return main.strip().lower(), options
+
+
+class FileStorage:
+    """
+    Uploaded file, whose content is kept in memory until it grows over parser ``spool_size``,
+    and in temporary file after that.
+    """
+    __slots__ = ('name', 'filename', 'content_type', 'headers', 'stream', 'size')
+
+    def __init__(self, name: str, filename: str, content_type: str, headers: dict, spool_size: int):
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type
+        self.headers = headers
+        self.stream = SpooledTemporaryFile(max_size=spool_size)
+        self.size = 0
+
+    def __repr__(self):
+        return '<FileStorage {!r} ({}, {} bytes)>'.format(self.filename, self.content_type, self.size)
+
+    def write(self, data):
+        self.size += len(data)
+        self.stream.write(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self.stream.read(size)
+
+    def save(self, destination, buffer_size: int = 64 * 1024):
+        """
+        Copies content into file object or file with given path.
+        """
+        self.stream.seek(0)
+        if hasattr(destination, 'write'):
+            shutil.copyfileobj(self.stream, destination, buffer_size)
+        else:
+            with open(destination, 'wb') as file:
+                shutil.copyfileobj(self.stream, file, buffer_size)
+
+    def close(self):
+        self.stream.close()
+
+
+class _Field:
+    __slots__ = ('name', 'data', 'size')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.data = bytearray()
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        self.data += data
+
+
+class FormDataParser:
+    """
+    Parses ``application/x-www-form-urlencoded`` and ``multipart/form-data`` request bodies.
+
+    Multipart body is read by chunks of ``chunk_size`` bytes and file parts are written straight into
+    ``FileStorage`` objects, so memory use does not depend on upload size. Limits are checked while parsing
+    and ``RequestEntityTooLarge`` is raised as soon as one is exceeded.
+    """
+
+    def __init__(self, max_content_length: int = None, max_part_size: int = None,
+                 max_form_memory_size: int = 500 * 1024, max_parts: int = 1000,
+                 spool_size: int = 1024 * 1024, chunk_size: int = 64 * 1024):
+        """
+        :param max_content_length: max size of whole body
+        :param max_part_size: max size of one file part
+        :param max_form_memory_size: max total size of non file fields, that are kept in memory
+        :param max_parts: max number of parts in multipart body
+        :param spool_size: size of file part, after which it is moved from memory into temporary file
+        """
+        self.max_content_length = max_content_length
+        self.max_part_size = max_part_size
+        self.max_form_memory_size = max_form_memory_size
+        self.max_parts = max_parts
+        self.spool_size = spool_size
+        self.chunk_size = chunk_size
+
+    def parse(self, request):
+        """
+        :return: tuple of form fields and files multi dicts
+        """
+        mimetype, options = parse_options_header(request.env.get('CONTENT_TYPE', ''))
+
+        length = request.content_length
+        if self.max_content_length is not None and length is not None and length > self.max_content_length:
+            raise RequestEntityTooLarge
+
+        if mimetype == 'application/x-www-form-urlencoded':
+            return self.parse_urlencoded(request), MultiDict()
+        if mimetype == 'multipart/form-data':
+            boundary = options.get('boundary')
+            if not boundary:
+                raise BadRequest('Missing boundary of multipart body')
+            return self.parse_multipart(self._chunks(request), boundary.encode('latin-1'),
+                                        options.get('charset', 'utf-8'))
+        return MultiDict(), MultiDict()
+
+    def _chunks(self, request):
+        total = 0
+        for chunk in request.iter_content(self.chunk_size):
+            total += len(chunk)
+            if self.max_content_length is not None and total > self.max_content_length:
+                raise RequestEntityTooLarge
+            yield chunk
+
+    def parse_urlencoded(self, request) -> MultiDict:
+        limit = self.max_form_memory_size
+        if limit is not None:
+            length = request.content_length
+            if length is not None and length > limit:
+                raise RequestEntityTooLarge
+
+        data = bytearray()
+        for chunk in self._chunks(request):
+            data += chunk
+            if limit is not None and len(data) > limit:
+                raise RequestEntityTooLarge
+
+        return MultiDict(parse_qsl(data.decode('latin-1'), keep_blank_values=True))
+
+    def parse_multipart(self, chunks, boundary: bytes, charset: str = 'utf-8'):
+        """
+        :param chunks: iterable of body chunks
+        :return: tuple of form fields and files multi dicts
+        """
+        delimiter = b'--' + boundary
+        # every part but the first one starts with line break before delimiter
+        separator = b'\r\n' + delimiter
+        keep = len(separator) + 1
+
+        fields, files = [], []
+        form_size = 0
+        buffer = bytearray()
+        part = None
+        state = 'preamble'
+        chunks = iter(chunks)
+
+        while True:
+            chunk = next(chunks, None)
+            if chunk is not None:
+                buffer += chunk
+            elif state != 'end':
+                if not buffer:
+                    raise BadRequest('Unexpected end of multipart body')
+
+            progress = True
+            while progress and state != 'end':
+                progress = False
+
+                if state == 'preamble':
+                    index = buffer.find(delimiter)
+                    if index >= 0 and len(buffer) >= index + len(delimiter) + 2:
+                        after = index + len(delimiter)
+                        state = 'end' if buffer[after:after + 2] == b'--' else 'headers'
+                        del buffer[:after + 2]
+                        progress = True
+                    elif index < 0 and len(buffer) > keep:
+                        del buffer[:-keep]
+
+                elif state == 'headers':
+                    index = buffer.find(b'\r\n\r\n')
+                    if index < 0:
+                        if len(buffer) > 16 * 1024:
+                            raise BadRequest('Too large headers of multipart part')
+                        break
+
+                    if len(fields) + len(files) >= self.max_parts:
+                        raise RequestEntityTooLarge
+                    part = self._make_part(bytes(buffer[:index]), charset)
+                    del buffer[:index + 4]
+                    state = 'body'
+                    progress = True
+
+                elif state == 'body':
+                    index = buffer.find(separator)
+                    if index >= 0:
+                        end, after = index, index + len(separator)
+                        if len(buffer) < after + 2:
+                            # not yet known, whether this is last delimiter
+                            end = -1
+                    else:
+                        end, after = max(0, len(buffer) - keep), None
+
+                    if end > 0:
+                        size = part.size + end
+                        if isinstance(part, FileStorage):
+                            if self.max_part_size is not None and size > self.max_part_size:
+                                raise RequestEntityTooLarge
+                        else:
+                            form_size += end
+                            if self.max_form_memory_size is not None and form_size > self.max_form_memory_size:
+                                raise RequestEntityTooLarge
+
+                        with memoryview(buffer) as view, view[:end] as data:
+                            part.write(data)
+                        del buffer[:end]
+                        if after is not None:
+                            after -= end
+                        progress = True
+
+                    if after is not None and end >= 0:
+                        if isinstance(part, FileStorage):
+                            part.stream.seek(0)
+                            files.append((part.name, part))
+                        else:
+                            fields.append((part.name, part.data.decode(charset, 'replace')))
+                        part = None
+
+                        state = 'end' if buffer[after:after + 2] == b'--' else 'headers'
+                        del buffer[:after + 2]
+                        progress = True
+
+            if state == 'end':
+                # epilogue is ignored, but body is read till the end to keep connection usable
+                for _ in chunks:
+                    pass
+                break
+
+            if chunk is None:
+                raise BadRequest('Unexpected end of multipart body')
+
+        return MultiDict(fields), MultiDict(files)
+
+    def _make_part(self, data: bytes, charset: str):
+        headers = {}
+        for line in data.decode(charset, 'replace').split('\r\n'):
+            name, sep, value = line.partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+
+        disposition, options = parse_options_header(headers.get('content-disposition', ''))
+        if disposition != 'form-data' or 'name' not in options:
+            raise BadRequest('Invalid Content-Disposition of multipart part')
+
+        if 'filename' in options:
+            return FileStorage(options['name'], options['filename'],
+                               headers.get('content-type', 'application/octet-stream'), headers, self.spool_size)
+        return _Field(options['name'])
+
+
+default_parser = FormDataParser()
@@ -0,0 +1,136 @@
+import bisect
+import threading
+
+# upper bounds of latency buckets in seconds, from 10 microseconds to 10 seconds
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+#: phases of request, that ``YAWF`` measures, ``write`` is the rest of request time spent on
+#: rendering and sending response body
+PHASES = ('make_request', 'before_response', 'find_handler', 'handler', 'after_response', 'write', 'total')
+
+
+class Histogram:
+    """
+    Fixed buckets histogram of durations in seconds.
+    """
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # the last count is for values above the last bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> float:
+        """
+        :return: upper bound of bucket, that holds given fraction of observed values
+        """
+        if not self.count:
+            return 0.0
+
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p99': self.percentile(0.99),
+            'buckets': dict(zip(self.buckets + (float('inf'),), self.counts)),
+        }
+
+
+class RouteStats:
+    __slots__ = ('requests', 'errors', 'latency')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.requests = 0
+        #: number of responses with 5xx status
+        self.errors = 0
+        self.latency = Histogram(buckets)
+
+    def snapshot(self) -> dict:
+        return {'requests': self.requests, 'errors': self.errors, 'latency': self.latency.snapshot()}
+
+
+class Metrics:
+    """
+    In process registry of request timings, that ``YAWF`` fills when created with ``metrics`` argument.
+
+    Phase timings are kept in histogram per phase, request counters and latency are kept per matched route,
+    requests without matched route are kept under ``None`` key. Callbacks added with ``subscribe`` are
+    called for every request.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.phases = {}
+        self.routes = {}
+        self.callbacks = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """
+        Adds ``callback(environ, route, status, timings)``, that is called, when response is sent.
+        ``timings`` maps phase name to seconds, ``route`` is None, if no route matched.
+        """
+        self.callbacks.append(callback)
+        return callback
+
+    def record(self, environ, route, status: int, timings: dict):
+        key = None if route is None else (route.method, route.rule)
+
+        with self._lock:
+            for phase, value in timings.items():
+                histogram = self.phases.get(phase)
+                if histogram is None:
+                    histogram = self.phases[phase] = Histogram(self.buckets)
+                histogram.observe(value)
+
+            stats = self.routes.get(key)
+            if stats is None:
+                stats = self.routes[key] = RouteStats(self.buckets)
+            stats.requests += 1
+            if status >= 500:
+                stats.errors += 1
+            stats.latency.observe(timings['total'])
+
+        for callback in self.callbacks:
+            callback(environ, route, status, timings)
+
+    def snapshot(self) -> dict:
+        """
+        :return: copy of collected metrics, routes are keyed with ``'METHOD rule'`` strings
+        """
+        with self._lock:
+            return {
+                'phases': {phase: histogram.snapshot() for phase, histogram in self.phases.items()},
+                'routes': {
+                    '{} {}'.format(*key) if key is not None else None: stats.snapshot()
+                    for key, stats in self.routes.items()
+                },
+            }
+
+    def reset(self):
+        with self._lock:
+            self.phases.clear()
+            self.routes.clear()
@@ -1,10 +1,26 @@
 import re
 import logging
+import threading
+from collections import OrderedDict, namedtuple
+from urllib.parse import urlencode
 
+from .converters import DEFAULT_CONVERTERS
 from .errors import NotFound, MethodNotAllowed
+from .utils import compose
 
 logger = logging.getLogger(__name__)
 
+_REGEX_META = frozenset('.^$*+?{}[]\\|()')
+_QUANTIFIERS = frozenset('*+?{')
+# ``<name>`` or ``<type:name>`` variable of route template, regex named groups ``(?P<name>...)`` are skipped
+_VARIABLE = re.compile(r'(?<!\?P)<(?:(\w+):)?(\w+)>')
+
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'size', 'maxsize'))
+
+# format of ``Router.snapshot`` data, changed whenever router or route state changes
+SNAPSHOT_VERSION = 2
+
 
 class MultipleRouteDefinition(Exception):
     """
@@ -12,20 +28,125 @@ class MultipleRouteDefinition(Exception):
     """
 
 
+class BuildError(Exception):
+    """
+    Thrown if url can not be built for route name and values given to ``url_for``
+    """
+
+
+def split_rule(rule: str):
+    """
+    Splits route rule into literal prefix and regex tail.
+
+    :return: tuple of literal prefix and flag, that whole rule is literal
+    """
+    body = rule[1:] if rule.startswith('^') else rule
+    if body.endswith('$') and not body.endswith('\\$'):
+        body = body[:-1]
+
+    if '|' in body:
+        # top level alternation makes any prefix meaningless
+        return '', False
+
+    for pos, char in enumerate(body):
+        if char in _REGEX_META:
+            if char in _QUANTIFIERS:
+                pos -= 1
+            return body[:max(pos, 0)], False
+
+    return body, True
+
+
+def parse_template(rule: str, converters: dict):
+    """
+    Splits route template like ``/users/<int:id>`` into literal strings and ``(name, converter)`` pairs.
+
+    :return: list of template parts, None if rule has no variables
+    """
+    parts = []
+    pos = 0
+    for match in _VARIABLE.finditer(rule):
+        kind, name = match.groups()
+        try:
+            converter = converters[kind or 'str']
+        except KeyError:
+            raise ValueError('Unknown converter "{}" in rule "{}"'.format(kind, rule)) from None
+
+        if match.start() > pos:
+            parts.append(rule[pos:match.start()])
+        parts.append((name, converter))
+        pos = match.end()
+
+    if not parts:
+        return None
+
+    if pos < len(rule):
+        parts.append(rule[pos:])
+    return parts
+
+
 class Route:
-    def __init__(self, path: str, method, handler):
+    """
+    Route rule is either template with ``<type:name>`` variables and literal text around them,
+    or regex with named groups.
+
+    Regex of rule is compiled, and so checked, when route is created. Routes loaded from
+    ``Router.from_snapshot`` were checked, when snapshot was made, and compile regex on first match.
+
+    :ivar pattern: regex source of rule
+    :ivar prefix: literal prefix of rule, that router indexes route by
+    :ivar is_static: whole rule is literal and is matched with dict lookup
+    """
+    __slots__ = ('rule', 'pattern', 'path', 'method', 'handler', 'name', 'template', 'converters', 'prefix',
+                 'is_static')
+
+    def __init__(self, path: str, method, handler, name: str = None, converters: dict = None):
+        self.rule = path
+        self.method = method
+        self.handler = handler
+        self.name = name
+        self.converters = None
+        self.template = parse_template(path, converters or DEFAULT_CONVERTERS)
+
+        if self.template is not None:
+            pattern = ''.join(
+                re.escape(part) if isinstance(part, str) else '(?P<{}>{})'.format(part[0], part[1].regex)
+                for part in self.template
+            )
+            self.pattern = '^' + pattern + '$'
+            self.path = re.compile(self.pattern)
+            self.prefix = self.template[0] if isinstance(self.template[0], str) else ''
+            self.is_static = False
+            self.converters = {
+                part[0]: part[1] for part in self.template if not isinstance(part, str) and not part[1].identity
+            } or None
+            return
+
+        self.prefix, self.is_static = split_rule(path)
+
         if not path.startswith('^'):
             path = '^' + path
 
         if not path.endswith('$'):
             path += '$'
 
+        self.pattern = path
         self.path = re.compile(path)
-        self.method = method
-        self.handler = handler
+
+    def __getattr__(self, name):
+        # called only while ``path`` slot is empty, that is for routes loaded from snapshot
+        if name == 'path':
+            self.path = re.compile(self.pattern)
+            return self.path
+        raise AttributeError(name)
+
+    def __getstate__(self):
+        # compiled regex is left out of snapshot, it is compiled again on first match,
+        # pickle restores slots from ``(None, slots)`` state by itself
+        return None, {name: getattr(self, name) for name in self.__slots__ if name != 'path'}
 
     def __str__(self):
-        return 'Rule({}, {}, {})'.format(self.method, self.path, self.handler.__name__)
+        return 'Rule({}, {}, {})'.format(self.method, self.pattern, getattr(self.handler, '__name__', self.handler))
 
     __repr__ = __str__
 
@@ -33,45 +154,277 @@ class Route:
         return self.path.match(path)
 
     def get_url_args(self, path):
-        return self.match_path(path).groupdict()
+        return self.make_args(self.match_path(path))
+
+    def make_args(self, match) -> dict:
+        """
+        Makes handler arguments from match object of this route.
+        """
+        args = match.groupdict()
+        if self.converters is not None:
+            for name, converter in self.converters.items():
+                args[name] = converter.to_python(args[name])
+        return args
+
+    def build(self, values: dict) -> str:
+        """
+        Makes url from template variables, values not used by template go to query string.
+        """
+        if self.template is None:
+            if not self.is_static:
+                raise BuildError('Url can not be built for regex rule "{}"'.format(self.rule))
+            parts = [self.prefix]
+        else:
+            values = dict(values)
+            parts = []
+            for part in self.template:
+                if isinstance(part, str):
+                    parts.append(part)
+                    continue
+
+                name, converter = part
+                try:
+                    parts.append(converter.to_url(values.pop(name)))
+                except KeyError:
+                    raise BuildError('Missing value "{}" for rule "{}"'.format(name, self.rule)) from None
+
+        if values:
+            parts.append('?' + urlencode(values, doseq=True))
+        return ''.join(parts)
+
+
+class RouteNode:
+    """
+    Node of prefix tree of path segments.
+
+    Each node keeps regex routes whose literal prefix ends on this node, grouped by rule,
+    so every rule is matched once whatever number of methods it has.
+    """
+    __slots__ = ('children', 'rules')
+
+    def __init__(self):
+        self.children = {}
+        self.rules = {}
+
+    def add(self, segments, route: Route, index: int):
+        node = self
+        for segment in segments:
+            node = node.children.setdefault(segment, RouteNode())
+
+        methods = node.rules.setdefault(route.rule, {})
+        methods[route.method] = (index, route)
+
+    def candidates(self, path: str):
+        """
+        Yields method maps of all nodes lying on the path.
+        """
+        node = self
+        if node.rules:
+            yield node.rules
+
+        for segment in path.split('/')[1:]:
+            node = node.children.get(segment)
+            if node is None:
+                return
+            if node.rules:
+                yield node.rules
 
 
 class Router:
-    _routes = {}
+    def __init__(self, cache_size: int = 0):
+        """
+        :param cache_size: max number of resolved (path, method) pairs to keep, 0 disables cache
+        """
+        self.converters = dict(DEFAULT_CONVERTERS)
+        self._routes = {}
+        self._names = {}
+        self._static = {}
+        self._tree = RouteNode()
+        self._counter = 0
 
-    def add_route(self, method, path, handler):
-        try:
-            found = self.search_route(path, method)
-        except (NotFound, MethodNotAllowed):
-            pass
-        else:
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def add_route(self, method, path, handler, middleware=(), name: str = None):
+        """
+        :param path: template like ``/users/<int:id>`` or regex with named groups
+        :param middleware: middleware wrapped around this route handler only, see ``YAWF.use``
+        :param name: name to build url with ``url_for``, handler name by default
+        """
+        name = name or getattr(handler, '__name__', None)
+        route = Route(path=path, method=method, handler=compose(middleware, handler), name=name,
+                      converters=self.converters)
+
+        # routes are told apart by normalized regex, so ``/data`` and ``^/data$`` are the same route
+        key = route.pattern, method
+        if key in self._routes:
             raise MultipleRouteDefinition
+        self._routes[key] = route
+        if name is not None:
+            # the same handler may serve several rules, url is built for the first one
+            self._names.setdefault(name, route)
+        self._index(route)
+        self.cache_clear()
+
+    def _index(self, route: Route):
+        prefix = route.prefix
+        self._counter += 1
 
-        self._routes[path, method] = (Route(path=path, method=method, handler=handler))
+        if route.is_static:
+            # static routes are looked up before the tree, so the route is left out of the dict,
+            # when rule added earlier matches the same path, and it keeps winning like in insertion order
+            if self._search_tree(prefix, route.method)[0] is None:
+                self._static.setdefault(prefix, {}).setdefault(route.method, route)
+        else:
+            segments = prefix[:prefix.rfind('/') + 1].split('/')[1:-1]
+            self._tree.add(segments, route, self._counter)
 
-    def add_get(self, path, func):
-        self.add_route('GET', path, func)
+    def add_get(self, path, func, middleware=(), name=None):
+        self.add_route('GET', path, func, middleware, name)
 
-    def add_post(self, path, func):
-        self.add_route('POST', path, func)
+    def add_post(self, path, func, middleware=(), name=None):
+        self.add_route('POST', path, func, middleware, name)
 
-    def add_put(self, path, func):
-        self.add_route('PUT', path, func)
+    def add_put(self, path, func, middleware=(), name=None):
+        self.add_route('PUT', path, func, middleware, name)
 
-    def add_patch(self, path, func):
-        self.add_route('PATCH', path, func)
+    def add_patch(self, path, func, middleware=(), name=None):
+        self.add_route('PATCH', path, func, middleware, name)
+
+    def snapshot(self) -> bytes:
+        """
+        Freezes fully built route table, ``from_snapshot`` loads it without parsing and checking rules again.
+
+        Handlers are pickled by reference, so they have to be importable module level functions
+        or picklable objects. Per route middleware made by closures, like ``ResponseCache.cached``, can't be pickled.
+
+        :raises TypeError: naming the first route, which handler can't be pickled
+        """
+        import pickle
+
+        state = SNAPSHOT_VERSION, self.converters, self._routes, self._names, self._static, self._tree, self._counter
+        try:
+            return pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            # pickle error does not tell which route it came from, so handlers are tried one by one
+            for route in self._routes.values():
+                try:
+                    pickle.dumps(route.handler, pickle.HIGHEST_PROTOCOL)
+                except (pickle.PicklingError, TypeError, AttributeError) as route_error:
+                    raise TypeError('Handler of route {} {} can not be pickled: {}'.format(
+                        route.method, route.rule, route_error)) from route_error
+            raise
+
+    @classmethod
+    def from_snapshot(cls, data: bytes, cache_size: int = 0) -> 'Router':
+        """
+        Loads router saved with ``snapshot``, data is unpickled, so it must come from trusted source.
+
+        :raises ValueError: if snapshot was made by other version of router
+        """
+        import pickle
+
+        state = pickle.loads(data)
+        if state[0] != SNAPSHOT_VERSION:
+            raise ValueError('Unsupported router snapshot version {}'.format(state[0]))
+
+        router = cls(cache_size=cache_size)
+        _, router.converters, router._routes, router._names, router._static, router._tree, router._counter = state
+        return router
+
+    def url_for(self, endpoint: str, **values) -> str:
+        """
+        Builds url of route registered with ``endpoint`` name, values not used by route template are added as query string.
+        """
+        route = self._names.get(endpoint)
+        if route is None:
+            raise BuildError('No route named "{}"'.format(endpoint))
+        return route.build(values)
+
+    def _search_tree(self, path, method):
+        """
+        :return: tuple of best route, its match object and flag, that any rule matched path
+        """
+        best = best_match = None
+        best_index = 0
+        matched = False
+
+        for rules in self._tree.candidates(path):
+            for methods in rules.values():
+                found = methods.get(method)
+                if found is not None and best is not None and found[0] > best_index:
+                    continue
+
+                route = found[1] if found is not None else next(iter(methods.values()))[1]
+                match = route.match_path(path)
+                if match is None:
+                    continue
+
+                matched = True
+                if found is not None:
+                    best_index, best, best_match = found[0], route, match
+
+        return best, best_match, matched
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, len(self._cache), self.cache_size)
+
+    def cache_clear(self):
+        with self._cache_lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
 
     def search_route(self, path, method):
-        routes = [route for route in self._routes.values() if route.match_path(path)]
-        if not routes:
-            logger.warning('Path {} not found'.format(path))
-            raise NotFound(path)
-
-        routes = [route for route in routes if route.method == method]
-        if not routes:
-            logger.warning('Method {} not allowed for path {}'.format(method, path))
+        """
+        :return: tuple of handler and its arguments
+        """
+        route, args = self.match(path, method)
+        return route.handler, args
+
+    def match(self, path, method):
+        """
+        :return: tuple of matched route and handler arguments
+        """
+        if not self.cache_size:
+            return self._match(path, method)
+
+        key = path, method
+        with self._cache_lock:
+            found = self._cache.get(key)
+            if found is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return found
+
+            self.misses += 1
+
+        found = self._match(path, method)
+
+        with self._cache_lock:
+            self._cache[key] = found
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return found
+
+    def _match(self, path, method):
+        methods = self._static.get(path)
+        if methods is not None:
+            route = methods.get(method)
+            if route is not None:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug('Found route %s', route)
+                return route, {}
+
+        route, match, matched = self._search_tree(path, method)
+        if route is None:
+            if not matched and methods is None:
+                raise NotFound(path)
+
             raise MethodNotAllowed
 
-        route = routes[0]
-        logger.debug('Found route {}'.format(route))
-        return route.handler, route.get_url_args(path)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Found route %s', route)
+        return route, route.make_args(match)
@@ -0,0 +1,340 @@
+"""
+Preforking wsgi server, that needs only standard library.
+
+Master process starts ``workers`` processes, each of them accepts connections from the same
+listening socket and handles them in a bounded pool of threads. Master respawns workers, that died
+or were recycled after ``max_requests`` requests, and restarts all of them gracefully on SIGHUP::
+
+    yawf serve package.module:app --bind 0.0.0.0:8000 --workers 4 --threads 8
+"""
+import os
+import sys
+import time
+import errno
+import random
+import signal
+import socket
+import logging
+import argparse
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import ServerHandler, WSGIRequestHandler, WSGIServer
+
+logger = logging.getLogger(__name__)
+
+# exit code of worker, that could not load application, master gives up instead of respawning it
+BOOT_ERROR = 3
+
+
+def load_app(target: str):
+    """
+    Imports wsgi application given as ``module:attribute``, attribute is ``app`` by default.
+    """
+    module_name, _, name = target.partition(':')
+    module = importlib.import_module(module_name)
+
+    app = module
+    for attribute in (name or 'app').split('.'):
+        app = getattr(app, attribute)
+    return app
+
+
+def parse_bind(bind: str):
+    host, _, port = bind.rpartition(':')
+    return host.strip('[]') or '127.0.0.1', int(port)
+
+
+def make_socket(address, reuse_port: bool = False, backlog: int = 1024) -> socket.socket:
+    family = socket.AF_INET6 if ':' in address[0] else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(address)
+    sock.listen(backlog)
+    return sock
+
+
+class RequestHandler(WSGIRequestHandler):
+    def handle(self):
+        self.raw_requestline = self.rfile.readline(65537)
+        if len(self.raw_requestline) > 65536:
+            self.requestline = self.request_version = self.command = ''
+            self.send_error(414)
+            return
+
+        if not self.parse_request():
+            return
+
+        handler = ServerHandler(self.rfile, self.wfile, self.get_stderr(), self.get_environ(),
+                                multithread=True, multiprocess=True)
+        handler.request_handler = self
+        handler.run(self.server.get_app())
+
+    def log_message(self, format, *args):
+        # requests are logged by application, see ``YAWF(access_log=True)``
+        pass
+
+
+class WorkerServer(WSGIServer):
+    """
+    Wsgi server on already listening socket, that handles connections in bounded pool of threads.
+    Accepting stops, while all threads are busy, so connections wait in socket backlog.
+    """
+
+    def __init__(self, sock: socket.socket, app, threads: int):
+        WSGIServer.__init__(self, sock.getsockname()[:2], RequestHandler, bind_and_activate=False)
+        self.socket.close()
+        # workers race for connections on shared socket, loser must not block in accept
+        sock.setblocking(False)
+        self.socket = sock
+        self.server_address = sock.getsockname()
+        self.server_name, self.server_port = self.server_address[:2]
+        self.setup_environ()
+        self.set_app(app)
+
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self._slots = threading.BoundedSemaphore(threads)
+        self.served = 0
+
+    def get_request(self):
+        conn, address = self.socket.accept()
+        # on BSD and macOS accepted socket inherits non-blocking mode of listening one,
+        # while request handler reads it in blocking way
+        conn.setblocking(True)
+        return conn, address
+
+    def process_request(self, request, client_address):
+        self.served += 1
+        self._slots.acquire()
+        self.executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def handle_error(self, request, client_address):
+        logger.exception('Error while handling request from %s', client_address[0])
+
+    def server_close(self):
+        # socket is owned by master or by worker itself, it is closed after pending requests are done
+        self.executor.shutdown(wait=True)
+        self.socket.close()
+
+
+class Worker:
+    def __init__(self, config, sock: socket.socket = None, app=None):
+        self.config = config
+        self.sock = sock
+        self.app = app
+        self.alive = True
+        self.max_requests = config.max_requests
+        if self.max_requests and config.max_requests_jitter:
+            self.max_requests += random.randint(0, config.max_requests_jitter)
+
+    def stop(self, signum, frame):
+        self.alive = False
+
+    def run(self, master_pid: int):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+        try:
+            app = self.app if self.app is not None else load_app(self.config.app)
+        except Exception:
+            logger.exception('Failed to load application "%s"', self.config.app)
+            os._exit(BOOT_ERROR)
+
+        sock = self.sock or make_socket(self.config.address, reuse_port=True, backlog=self.config.backlog)
+        server = WorkerServer(sock, app, self.config.threads)
+        server.timeout = 0.5
+
+        try:
+            while self.alive:
+                server.handle_request()
+                if os.getppid() != master_pid:
+                    logger.warning('Master process %s is gone, worker %s exits', master_pid, os.getpid())
+                    break
+
+                if self.max_requests and server.served >= self.max_requests:
+                    logger.info('Worker %s served %s requests, recycling', os.getpid(), server.served)
+                    break
+        finally:
+            server.server_close()
+            # let application finish its background work
+            shutdown = getattr(app, 'shutdown', None)
+            if shutdown is not None:
+                shutdown(self.config.graceful_timeout)
+
+
+class Master:
+    def __init__(self, config):
+        self.config = config
+        self.workers = {}
+        self.signals = []
+        self.sock = None
+        self.app = None
+        self.pid = os.getpid()
+
+    def on_signal(self, signum, frame):
+        self.signals.append(signum)
+
+    def spawn(self):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return pid
+
+        status = 0
+        try:
+            Worker(self.config, self.sock, self.app).run(self.pid)
+        except SystemExit as error:
+            status = error.code or 0
+        except BaseException:
+            logger.exception('Worker %s failed', os.getpid())
+            status = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+
+    def kill(self, pids, signum=signal.SIGTERM):
+        for pid in pids:
+            try:
+                os.kill(pid, signum)
+            except OSError as error:
+                if error.errno != errno.ESRCH:
+                    raise
+
+    def reap(self) -> bool:
+        """
+        Collects exited workers.
+
+        :return: False if worker could not load application
+        """
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return True
+
+            if not pid:
+                return True
+
+            self.workers.pop(pid, None)
+            if os.WIFEXITED(status) and os.WEXITSTATUS(status) == BOOT_ERROR:
+                logger.error('Worker %s could not load application', pid)
+                return False
+
+    def restart(self):
+        """
+        Starts new workers and stops old ones, that finish requests in progress.
+        """
+        logger.info('Restarting workers')
+        old = list(self.workers)
+        for _ in range(self.config.workers):
+            self.spawn()
+        self.kill(old)
+
+    def stop(self, timeout: float):
+        self.kill(list(self.workers))
+        deadline = time.monotonic() + timeout
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.05)
+
+        if self.workers:
+            logger.warning('Killing workers %s, that did not stop in %s seconds', list(self.workers), timeout)
+            self.kill(list(self.workers), signal.SIGKILL)
+            while self.workers:
+                pid, _ = os.waitpid(-1, 0)
+                self.workers.pop(pid, None)
+
+    def run(self) -> int:
+        config = self.config
+        if not config.reuse_port:
+            self.sock = make_socket(config.address, backlog=config.backlog)
+        if config.preload:
+            self.app = load_app(config.app)
+
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(signum, self.on_signal)
+
+        logger.info('Serving "%s" on %s:%s with %s workers', config.app, config.address[0], config.address[1],
+                    config.workers)
+        for _ in range(config.workers):
+            self.spawn()
+
+        status = 0
+        try:
+            while True:
+                while self.signals:
+                    signum = self.signals.pop(0)
+                    if signum in (signal.SIGTERM, signal.SIGINT):
+                        return status
+                    if signum == signal.SIGHUP:
+                        self.restart()
+
+                if not self.reap():
+                    status = BOOT_ERROR
+                    return status
+
+                # respawn dead and recycled workers
+                for _ in range(config.workers - len(self.workers)):
+                    self.spawn()
+
+                time.sleep(0.1)
+        finally:
+            self.stop(config.graceful_timeout)
+            if self.sock is not None:
+                self.sock.close()
+            logger.info('Server stopped')
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='yawf')
+    commands = parser.add_subparsers(dest='command')
+
+    serve = commands.add_parser('serve', help='run preforking wsgi server')
+    serve.add_argument('app', help='wsgi application as module:attribute')
+    serve.add_argument('--bind', '-b', default='127.0.0.1:8000', help='host:port to listen on')
+    serve.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1, help='number of processes')
+    serve.add_argument('--threads', '-t', type=int, default=8, help='number of threads per process')
+    serve.add_argument('--max-requests', type=int, default=0,
+                       help='restart worker after this number of requests, 0 disables recycling')
+    serve.add_argument('--max-requests-jitter', type=int, default=0,
+                       help='random addition to max requests, so workers are not recycled at once')
+    serve.add_argument('--reuse-port', action='store_true',
+                       help='every worker listens on its own socket with SO_REUSEPORT')
+    serve.add_argument('--preload', action='store_true', help='load application in master before fork')
+    serve.add_argument('--backlog', type=int, default=1024)
+    serve.add_argument('--graceful-timeout', type=float, default=30.0,
+                       help='seconds to wait for workers to finish requests on stop')
+    serve.add_argument('--log-level', default='info')
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = make_parser()
+    config = parser.parse_args(argv)
+    if config.command != 'serve':
+        parser.print_help()
+        return 2
+
+    if not hasattr(os, 'fork'):
+        parser.error('preforking server needs os.fork')
+    if config.reuse_port and not hasattr(socket, 'SO_REUSEPORT'):
+        parser.error('SO_REUSEPORT is not supported on this platform')
+
+    logging.basicConfig(level=config.log_level.upper(), format='[%(asctime)s] [%(process)d] %(levelname)s %(message)s')
+    config.address = parse_bind(config.bind)
+    sys.path.insert(0, os.getcwd())
+    return Master(config).run()
@@ -0,0 +1,236 @@
+import os
+import stat
+import time
+import threading
+import mimetypes
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+from .cache import etag_matches
+from .compression import parse_accept_encoding
+from .errors import NotFound
+from .wrappers import FileResponse, Response
+
+
+class StaticFile:
+    """
+    Stat result and prebuilt headers of one file, with its content, if file is small enough to keep in memory.
+    """
+    __slots__ = ('path', 'size', 'mtime', 'etag', 'headers', 'data', 'gzip')
+
+    def __init__(self, path: str, result: os.stat_result, content_type: str, encoding: str = None,
+                 cache_control: str = None):
+        self.path = path
+        self.size = result.st_size
+        self.mtime = int(result.st_mtime)
+        self.etag = '"{:x}-{:x}{}"'.format(result.st_mtime_ns, result.st_size, '-' + encoding if encoding else '')
+        self.data = None
+        self.gzip = None
+
+        headers = [
+            ('Content-Type', content_type),
+            ('ETag', self.etag),
+            ('Last-Modified', formatdate(result.st_mtime, usegmt=True)),
+        ]
+        if encoding is not None:
+            headers.append(('Content-Encoding', encoding))
+        if cache_control is not None:
+            headers.append(('Cache-Control', cache_control))
+        self.headers = headers
+
+    @property
+    def version(self) -> tuple:
+        return self.etag, self.gzip.etag if self.gzip is not None else None
+
+    def not_modified(self, environ) -> bool:
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            return etag_matches(if_none_match, self.etag)
+
+        if_modified_since = environ.get('HTTP_IF_MODIFIED_SINCE')
+        if if_modified_since:
+            try:
+                return self.mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+class StaticFiles:
+    """
+    Serves files from directory, mounted to router under url prefix::
+
+        StaticFiles('/srv/assets').mount(app.router, '/static')
+
+    Stat results are cached and checked again at most once per ``revalidate`` seconds, files not bigger
+    than ``max_file_size`` are kept in memory in LRU cache of ``max_cache_size`` bytes, so frequently
+    requested file costs no system calls. Bigger files are sent with ``FileResponse``, that uses
+    ``wsgi.file_wrapper`` and supports ranges. If client accepts gzip and file has ``.gz`` sibling,
+    the sibling is sent with ``Content-Encoding: gzip``.
+    """
+
+    def __init__(self, directory: str, max_file_size: int = 256 * 1024, max_cache_size: int = 16 * 1024 * 1024,
+                 max_entries: int = 10000, revalidate: float = 1.0, gzip: bool = True, cache_control: str = None,
+                 chunk_size: int = 64 * 1024):
+        """
+        :param max_entries: max number of cached stat results
+        :param revalidate: seconds to use cached stat result for
+        :param gzip: look for precompressed ``.gz`` siblings of files
+        :param cache_control: value of Cache-Control header of responses
+        """
+        self.directory = os.path.realpath(directory)
+        self.max_file_size = max_file_size
+        self.max_cache_size = max_cache_size
+        self.max_entries = max_entries
+        self.revalidate = revalidate
+        self.gzip = gzip
+        self.cache_control = cache_control
+        self.chunk_size = chunk_size
+
+        # relative path to tuple of check time and StaticFile, None for missing files
+        self._entries = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # lock and caches belong to process, pickled instance, e.g. in router snapshot, starts with empty ones
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_entries'] = OrderedDict()
+        state['_cached_bytes'] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def mount(self, router, prefix: str = '/static', name: str = 'static'):
+        path = prefix.rstrip('/') + '/<path:path>'
+        router.add_get(path, self, name=name)
+        router.add_route('HEAD', path, self)
+        return self
+
+    def resolve(self, path: str) -> str:
+        """
+        :return: absolute path of file inside directory, None if path leads out of it
+        """
+        if '\x00' in path or '\\' in path:
+            return None
+
+        parts = [part for part in path.split('/') if part and part != '.']
+        if not parts or '..' in parts:
+            return None
+        return os.path.join(self.directory, *parts)
+
+    def _stat(self, path: str):
+        full_path = self.resolve(path)
+        if full_path is None:
+            return None
+
+        try:
+            result = os.stat(full_path)
+        except (OSError, ValueError):
+            return None
+
+        if not stat.S_ISREG(result.st_mode):
+            return None
+
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        entry = StaticFile(full_path, result, content_type, cache_control=self.cache_control)
+
+        if self.gzip:
+            try:
+                gzip_stat = os.stat(full_path + '.gz')
+            except OSError:
+                pass
+            else:
+                entry.gzip = StaticFile(full_path + '.gz', gzip_stat, content_type, 'gzip', self.cache_control)
+                entry.headers.append(('Vary', 'Accept-Encoding'))
+                entry.gzip.headers.append(('Vary', 'Accept-Encoding'))
+
+        return entry
+
+    def lookup(self, path: str) -> StaticFile:
+        """
+        :return: file entry, None if file does not exist
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is not None and now - cached[0] < self.revalidate:
+                self._entries.move_to_end(path)
+                return cached[1]
+
+        entry = self._stat(path)
+
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                old = old[1]
+                if entry is not None and old is not None and old.version == entry.version:
+                    # file did not change, keep loaded content
+                    entry = old
+                else:
+                    self._forget(old)
+
+            self._entries[path] = now, entry
+            while len(self._entries) > self.max_entries:
+                self._forget(self._entries.popitem(last=False)[1][1])
+
+        return entry
+
+    def _forget(self, entry: StaticFile):
+        if entry is not None:
+            for variant in (entry, entry.gzip):
+                if variant is not None and variant.data is not None:
+                    self._cached_bytes -= len(variant.data)
+                    variant.data = None
+
+    def _load(self, entry: StaticFile) -> bytes:
+        """
+        Reads small file into memory, evicting content of least recently used files to stay in budget.
+        """
+        with open(entry.path, 'rb') as file:
+            data = file.read()
+
+        if len(data) != entry.size:
+            # file changed after stat, it is sent once and checked again on next request
+            return data
+
+        with self._lock:
+            if entry.data is None:
+                for _, other in self._entries.values():
+                    if self._cached_bytes + len(data) <= self.max_cache_size:
+                        break
+                    self._forget(other)
+
+                if self._cached_bytes + len(data) <= self.max_cache_size:
+                    entry.data = data
+                    self._cached_bytes += len(data)
+        return data
+
+    def __call__(self, request, path: str):
+        entry = self.lookup(path)
+        if entry is None:
+            raise NotFound(request.path)
+
+        environ = request.env
+        if entry.gzip is not None:
+            accept = environ.get('HTTP_ACCEPT_ENCODING')
+            if accept and parse_accept_encoding(accept).get('gzip', 0) > 0:
+                entry = entry.gzip
+
+        if entry.not_modified(environ):
+            return Response(headers=[header for header in entry.headers if header[0] in ('ETag', 'Vary')],
+                            status=304)
+
+        if request.method == 'HEAD':
+            return Response((), headers=entry.headers + [('Content-Length', str(entry.size))])
+
+        if entry.size > self.max_file_size:
+            return FileResponse(entry.path, headers=list(entry.headers), chunk_size=self.chunk_size)
+
+        data = entry.data
+        if data is None:
+            data = self._load(entry)
+        return Response((data,), headers=entry.headers + [('Content-Length', str(len(data)))])
@@ -0,0 +1,157 @@
+import os
+import time
+import queue
+import logging
+import threading
+from collections.abc import Awaitable
+
+from .metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class TaskQueue:
+    """
+    Bounded pool of threads running background tasks, that handlers attach to request or response.
+
+    Threads are started on first submitted task, so queue costs nothing for applications without tasks
+    and is safe to create before server forks. When ``max_queue`` tasks are waiting, new tasks are dropped
+    and counted, so slow tasks never block sending of responses.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 1000):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.completed = self.failed = self.dropped = 0
+        #: seconds from submit till task is finished
+        self.latency = Histogram()
+        #: seconds task was running
+        self.duration = Histogram()
+
+        self._queue = queue.Queue(max_queue)
+        self._threads = []
+        self._pid = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def depth(self) -> int:
+        """
+        Number of tasks waiting to be run.
+        """
+        return self._queue.qsize()
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            # threads of parent process do not exist after fork
+            self._queue = queue.Queue(self.max_queue)
+            self._threads = [threading.Thread(target=self._work, name='yawf-task-{}'.format(i), daemon=True)
+                             for i in range(self.max_workers)]
+            for thread in self._threads:
+                thread.start()
+            self._pid = os.getpid()
+
+    def submit(self, func, *args, **kwargs) -> bool:
+        """
+        :return: False if task was dropped, because queue is full or closed
+        """
+        if self._closed:
+            logger.warning('Task %r is dropped, queue is shut down', func)
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        if self._pid != os.getpid():
+            self._start()
+
+        try:
+            self._queue.put_nowait((func, args, kwargs, time.perf_counter()))
+        except queue.Full:
+            logger.warning('Task %r is dropped, queue is full', func)
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def submit_all(self, tasks):
+        """
+        :param tasks: iterable of ``(func, args, kwargs)`` tuples
+        """
+        for func, args, kwargs in tasks:
+            self.submit(func, *args, **kwargs)
+
+    def _work(self):
+        clock = time.perf_counter
+        while True:
+            task = self._queue.get()
+            if task is _STOP:
+                return
+
+            func, args, kwargs, submitted = task
+            started = clock()
+            failed = False
+            try:
+                result = func(*args, **kwargs)
+                if isinstance(result, Awaitable):
+                    # asyncio is imported only by applications with coroutine tasks
+                    import asyncio
+
+                    loop = asyncio.new_event_loop()
+                    try:
+                        loop.run_until_complete(result)
+                    finally:
+                        loop.close()
+            except Exception:
+                logger.exception('Background task %r failed', func)
+                failed = True
+
+            finished = clock()
+            with self._lock:
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                self.duration.observe(finished - started)
+                self.latency.observe(finished - submitted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'depth': self.depth,
+                'completed': self.completed,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'latency': self.latency.snapshot(),
+                'duration': self.duration.snapshot(),
+            }
+
+    def shutdown(self, timeout: float = None):
+        """
+        Stops accepting tasks and waits, until queued ones are done.
+
+        :param timeout: max seconds to wait, None waits for all tasks
+        """
+        self._closed = True
+        if self._pid != os.getpid():
+            return
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def remaining():
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        for _ in self._threads:
+            # waits for room in full queue, so every queued task is run before stop, unless time is out
+            try:
+                self._queue.put(_STOP, timeout=remaining())
+            except queue.Full:
+                logger.warning('Shutdown timed out, %d queued tasks are not run', self.depth)
+                return
+
+        for thread in self._threads:
+            thread.join(remaining())
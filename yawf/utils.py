@@ -1,3 +1,6 @@
+import re
+
+
 def escape(s=None):
     if s is None:
         return ''
@@ -6,3 +9,185 @@ def escape(s=None):
         s = str(s)
 
     return s.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', "&quot;")
+
+
+# cookie-octet of rfc 6265, other values are sent quoted
+_COOKIE_SAFE = re.compile(r'^[!#-+\-./0-9:<-\[\]-~]*$')
+_COOKIE_NAME = re.compile(r"^[!#$%&'*+\-.^_`|~0-9A-Za-z]+$")
+_COOKIE_UNQUOTE = re.compile(r'\\(.)')
+
+
+def parse_cookie(header: str, cookies: dict = None) -> dict:
+    """
+    Parses ``Cookie`` request header in single pass, values may contain ``=``.
+    Only the first of cookies with the same name is kept, as it has the most specific path.
+
+    :param cookies: dict to put cookies into, new one if not given
+    """
+    if cookies is None:
+        cookies = {}
+    if not header:
+        return cookies
+
+    pairs = [item.split('=', 1) for item in header.split(';')]
+    found = {}
+    for pair in pairs:
+        if len(pair) == 2:
+            found[pair[0].strip()] = pair[1].strip()
+
+    if len(found) < len(pairs):
+        # duplicates or malformed items, assigning again in reverse order brings back the first of duplicates
+        for pair in reversed(pairs):
+            if len(pair) == 2:
+                found[pair[0].strip()] = pair[1].strip()
+    found.pop('', None)
+
+    if '"' in header:
+        for name, value in found.items():
+            if len(value) > 1 and value[0] == value[-1] == '"':
+                found[name] = _COOKIE_UNQUOTE.sub(r'\1', value[1:-1])
+
+    if cookies:
+        for name, value in found.items():
+            cookies.setdefault(name, value)
+    else:
+        cookies.update(found)
+
+    return cookies
+
+
+def dump_cookie(name: str, value: str = '', max_age: int = None, expires=None, path: str = '/',
+                domain: str = None, secure: bool = False, httponly: bool = False, samesite: str = None) -> str:
+    """
+    Makes value of ``Set-Cookie`` response header.
+
+    :param expires: datetime or unix timestamp
+    :param samesite: ``Strict``, ``Lax`` or ``None``
+    """
+    if not _COOKIE_NAME.match(name):
+        raise ValueError('Invalid cookie name "{}"'.format(name))
+
+    value = str(value)
+    if not _COOKIE_SAFE.match(value):
+        value = '"{}"'.format(value.replace('\\', '\\\\').replace('"', '\\"'))
+
+    parts = ['{}={}'.format(name, value)]
+    if max_age is not None:
+        parts.append('Max-Age={}'.format(int(max_age)))
+    if expires is not None:
+        from email.utils import formatdate
+
+        if not isinstance(expires, (int, float)):
+            expires = expires.timestamp()
+        parts.append('Expires={}'.format(formatdate(expires, usegmt=True)))
+    if domain is not None:
+        parts.append('Domain={}'.format(domain))
+    if path is not None:
+        parts.append('Path={}'.format(path))
+    if secure:
+        parts.append('Secure')
+    if httponly:
+        parts.append('HttpOnly')
+    if samesite is not None:
+        if samesite.lower() not in ('strict', 'lax', 'none'):
+            raise ValueError('Invalid SameSite value "{}"'.format(samesite))
+        parts.append('SameSite={}'.format(samesite.capitalize()))
+
+    return '; '.join(parts)
+
+
+def parse_range(header, size: int):
+    """
+    Parses ``Range`` request header with single range of bytes.
+
+    :return: tuple of start and stop (exclusive) positions, None if header is absent or can be ignored
+    :raises ValueError: if range can not be satisfied for given size
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+
+    first, sep, last = header[6:].strip().partition('-')
+    if not sep or not (first or last) or not (first.isdigit() or not first) or not (last.isdigit() or not last):
+        return None
+
+    if not first:
+        # suffix range, last n bytes
+        if not int(last) or not size:
+            raise ValueError('Range is not satisfiable')
+        return max(size - int(last), 0), size
+
+    start, stop = int(first), int(last) + 1 if last else size
+    if last and stop <= start:
+        return None
+
+    if start >= size:
+        raise ValueError('Range is not satisfiable')
+
+    return start, min(stop, size)
+
+
+class cached_property:
+    """
+    Property computed once per object and memoized in object's ``_cache`` dict, created on first use.
+
+    Used for request scoped attributes, parsed from wsgi environment on first access.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        cache = instance._cache
+        if cache is None:
+            cache = instance._cache = {}
+
+        try:
+            return cache[self.name]
+        except KeyError:
+            value = cache[self.name] = self.func(instance)
+            return value
+
+
+class ClosingIterator:
+    """
+    Wraps response body iterable, counts bytes given to server
+    and calls callbacks with itself, when server closes body.
+    """
+    __slots__ = ('_iterable', '_iterator', 'callbacks', 'sent')
+
+    def __init__(self, iterable, callbacks=()):
+        self._iterable = iterable
+        self._iterator = iter(iterable)
+        self.callbacks = list(callbacks)
+        self.sent = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        chunk = next(self._iterator)
+        self.sent += len(chunk)
+        return chunk
+
+    def close(self):
+        try:
+            close = getattr(self._iterable, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            for callback in self.callbacks:
+                callback(self)
+
+
+def compose(middleware, handler):
+    """
+    Wraps handler with middleware, so that first middleware is the outermost one.
+    """
+    for wrap in reversed(middleware):
+        handler = wrap(handler)
+    return handler
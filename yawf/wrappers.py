@@ -1,50 +1,111 @@
-import json
+import os
 import logging
-import http.client
+import functools
+import mimetypes
+from collections.abc import Mapping
+from urllib.parse import parse_qsl
+
+from .codec import default_codec
+from .status import HTTP_STATUSES_STRINGS
+from .utils import cached_property, dump_cookie, parse_cookie, parse_range
 
 
 logger = logging.getLogger(__name__)
 
-HTTP_STATUSES_STRINGS = http.client.responses
+
+def make_status_str(status: int) -> str:
+    return '{} {}'.format(status, HTTP_STATUSES_STRINGS[status])
 
 
 class Headers:
+    """
+    Ordered multi dict of http headers with case insensitive names.
+
+    Headers are kept as list of (name, value) pairs, which is given to wsgi server as is,
+    and lower cased names are indexed in dict of values, so lookups do not scan the list.
+    """
+    __slots__ = ('_headers', '_index')
+
     def __init__(self, env=None):
         if isinstance(env, Headers):
-            self._headers = env._headers[:]
+            headers = env._headers[:]
         elif isinstance(env, dict):
-            self._headers = [(key, val) for key, val in env.items()]
-        elif isinstance(env, (list, tuple)):
-            self._headers = [(key.replace('HTTP_', '').replace('_', '-'), subval.strip())
-                             for key, val in env
-                             for subval in val.split(',')]
+            headers = [(key, val) for key, val in env.items()]
+        elif isinstance(env, (list, tuple, EnvironHeaders)):
+            headers = list(env)
         else:
-            self._headers = []
+            headers = []
+
+        self._set_headers(headers)
+
+    @classmethod
+    def from_list(cls, headers: list) -> 'Headers':
+        """
+        Wraps list of (name, value) pairs without copying it.
+        """
+        h = cls.__new__(cls)
+        h._set_headers(headers)
+        return h
+
+    def _set_headers(self, headers: list):
+        self._headers = headers
+        self._index = index = {}
+        for name, val in headers:
+            key = name.lower()
+            if key in index:
+                index[key].append(val)
+            else:
+                index[key] = [val]
 
     def __getitem__(self, item: str):
-        for name, val in self._headers:
-            if name.lower() == item.lower():
-                return val
-        raise KeyError
+        return self._index[item.lower()][0]
 
     def get(self, item: str, default=None) -> str:
-        try:
-            return self[item]
-        except KeyError:
-            return default
+        values = self._index.get(item.lower())
+        return values[0] if values else default
 
     def getall(self, item: str) -> list:
-        return [val for name, val in self._headers if name.lower() == item.lower()]
+        return list(self._index.get(item.lower(), ()))
+
+    def getlist(self, item: str) -> list:
+        """
+        :return: all comma separated elements of list valued header, like Accept or Cache-Control
+        """
+        return _split_list(self.getall(item))
 
     def add(self, name: str, val: str):
         self._headers.append((name, val))
+        key = name.lower()
+        if key in self._index:
+            self._index[key].append(val)
+        else:
+            self._index[key] = [val]
+
+    def set(self, name: str, val: str):
+        """
+        Replaces all values of header with single one.
+        """
+        key = name.lower()
+        if key in self._index:
+            self._headers[:] = [header for header in self._headers if header[0].lower() != key]
+        self._headers.append((name, val))
+        self._index[key] = [val]
+
+    __setitem__ = set
+
+    def __delitem__(self, item: str):
+        key = item.lower()
+        del self._index[key]
+        self._headers[:] = [header for header in self._headers if header[0].lower() != key]
 
     def __contains__(self, item):
-        try:
-            self[item]
-            return True
-        except KeyError:
-            return False
+        return item.lower() in self._index
+
+    def __iter__(self):
+        return iter(self._headers)
+
+    def __len__(self):
+        return len(self._headers)
 
     def __repr__(self):
         return 'Headers({})'.format(', '.join(['{}: "{}"'.format(key, val) for key, val in self._headers]))
@@ -63,45 +124,177 @@ class Headers:
 
     @classmethod
     def from_wsgi_env(cls, env: dict) -> 'Headers':
-        h = cls()
-        h._headers = [(key.replace('HTTP_', '').replace('_', '-'), subval.strip())
-                      for key, val in env.items() if key.startswith('HTTP')
-                      for subval in val.split(',')]
-        return h
+        return cls(EnvironHeaders(env))
 
 
-class Cookies(dict):
-    def __init__(self, env=None):
-        if isinstance(env, Cookies):
-            super().__init__(env)
-        elif not env:
-            super().__init__()
-        elif isinstance(env, str):
-            self._init(env.split(';'))
-        else:
-            self._init(env)
+def _split_list(values) -> list:
+    return [item for value in values for item in (item.strip() for item in value.split(',')) if item]
 
-    def _init(self, item):
-        if isinstance(item, dict) and 'HTTP_COOKIE' in item:
-            for i in item['HTTP_COOKIE'].split(';'):
-                self._init(i.strip())
 
-        elif isinstance(item, dict):
-            self.update(item)
+@functools.lru_cache(maxsize=256)
+def environ_key(name: str) -> str:
+    """
+    :return: key of wsgi environment, that holds value of request header
+    """
+    key = name.upper().replace('-', '_')
+    if key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+        return key
+    return 'HTTP_' + key
 
-        elif isinstance(item, (list, tuple)):
-            for i in item:
-                self._init(i)
 
-        elif isinstance(item, str):
-            key, val = item.split('=')
-            self[key] = val
+class EnvironHeaders:
+    """
+    Read only view of request headers stored in wsgi environment.
+
+    Nothing is parsed up front: header name is converted to environment key only when it is looked up,
+    values are given as is and split on commas only by ``getlist``.
+    """
+    __slots__ = ('env',)
+
+    def __init__(self, env: dict):
+        self.env = env
+
+    def __getitem__(self, item: str) -> str:
+        key = environ_key(item)
+        value = self.env.get(key)
+        if not value and (value is None or key[0] == 'C'):
+            # wsgi servers may set CONTENT_TYPE and CONTENT_LENGTH to empty strings
+            raise KeyError(item)
+        return value
+
+    def get(self, item: str, default=None) -> str:
+        try:
+            return self[item]
+        except KeyError:
+            return default
+
+    def getall(self, item: str) -> list:
+        value = self.get(item)
+        return [] if value is None else [value]
+
+    def getlist(self, item: str) -> list:
+        """
+        :return: all comma separated elements of list valued header, like Accept or Cache-Control
+        """
+        return _split_list(self.getall(item))
+
+    def __contains__(self, item: str):
+        return self.get(item) is not None
+
+    def __iter__(self):
+        for key, value in self.env.items():
+            if key.startswith('HTTP_'):
+                yield key[5:].replace('_', '-').title(), value
+            elif key in ('CONTENT_TYPE', 'CONTENT_LENGTH') and value:
+                yield key.replace('_', '-').title(), value
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return 'EnvironHeaders({})'.format(', '.join(['{}: "{}"'.format(key, val) for key, val in self]))
+
+    __str__ = __repr__
+
+    @property
+    def wsgi_headers(self):
+        return list(self)
+
+
+class MultiDict(Mapping):
+    """
+    Immutable multi dict, that maps key to the first of its values.
+
+    All values of key are available with ``get_list``.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, pairs=()):
+        self._data = data = {}
+        for key, val in pairs:
+            if key in data:
+                data[key].append(val)
+            else:
+                data[key] = [val]
+
+    def __getitem__(self, item):
+        return self._data[item][0]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, item):
+        return item in self._data
+
+    def get_list(self, item, type=None) -> list:
+        """
+        :param type: callable to convert values with, values failed to convert are skipped
+        """
+        values = self._data.get(item, ())
+        if type is None:
+            return list(values)
+
+        result = []
+        for val in values:
+            try:
+                result.append(type(val))
+            except ValueError:
+                pass
+        return result
+
+    getlist = get_list
+
+    def get_int(self, item, default=None) -> int:
+        values = self._data.get(item)
+        if values is None:
+            return default
+
+        try:
+            return int(values[0])
+        except ValueError:
+            return default
+
+    def __repr__(self):
+        return 'MultiDict({})'.format(', '.join(['{}: {}'.format(key, val) for key, val in self._data.items()]))
+
+    __str__ = __repr__
+
+
+class Cookies(dict):
+    """
+    Request cookies, made from ``Cookie`` header value, wsgi environment, dict or list of ``name=value`` strings.
+    """
+    __slots__ = ()
+
+    def __init__(self, env=None):
+        super().__init__()
+        if not env:
+            return
+
+        if isinstance(env, str):
+            parse_cookie(env, self)
+        elif isinstance(env, Cookies):
+            self.update(env)
+        elif isinstance(env, dict):
+            if 'HTTP_COOKIE' in env:
+                parse_cookie(env['HTTP_COOKIE'], self)
+            else:
+                self.update(env)
+        else:
+            for item in env:
+                parse_cookie(item, self)
 
     def set(self, key: str, val: str):
         self[key] = val
 
     @property
     def wsgi_header_value(self):
+        """
+        :return: value of ``Cookie`` request header
+        """
         return '; '.join(['{}={}'.format(key, val) for key, val in self.items()])
 
     @property
@@ -109,13 +302,58 @@ class Cookies(dict):
         return 'HTTP_COOKIE', self.wsgi_header_value
 
 
+class ResponseCookies(Cookies):
+    """
+    Cookies of response, each assigned cookie is sent right away as ``Set-Cookie`` header
+    with default attributes, use ``Response.set_cookie`` for other ones.
+    """
+    __slots__ = ('_response',)
+
+    def __init__(self, response: 'Response'):
+        super().__init__()
+        self._response = response
+
+    def __setitem__(self, key: str, val: str):
+        super().__setitem__(key, val)
+        self._response.set_cookie(key, val)
+
+    def update(self, *args, **kwargs):
+        for key, val in dict(*args, **kwargs).items():
+            self[key] = val
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key: str, val: str = ''):
+        if key not in self:
+            self[key] = val
+        return self[key]
+
+    def _sent(self, *args, **kwargs):
+        raise TypeError('Set-Cookie header is already added, use Response.delete_cookie to drop cookie')
+
+    __delitem__ = pop = popitem = clear = _sent
+
+
 class Request:
-    _content = None
-    _headers = None
-    _cookies = None
+    __slots__ = ('env', 'route', '_cache', '_content', '_remaining', '_consumed')
+
+    #: max allowed size of request body in bytes, None means no limit
+    max_content_length = None
+    #: default size of chunks body is read with
+    chunk_size = 64 * 1024
+    #: ``yawf.formparser.FormDataParser`` with limits for ``form`` and ``files``, default parser if None
+    form_parser = None
 
     def __init__(self, environment):
         self.env = environment
+        #: ``yawf.router.Route`` matched by ``YAWF.find_handler``
+        self.route = None
+        self._cache = None
+        self._content = None
+        self._remaining = None
+        self._consumed = 0
 
     @property
     def path(self):
@@ -125,13 +363,132 @@ class Request:
     def method(self):
         return self.env['REQUEST_METHOD']
 
+    def add_task(self, func, *args, **kwargs):
+        """
+        Adds background task, that is run by ``YAWF.tasks`` after response is sent.
+        """
+        self.env.setdefault('yawf.tasks', []).append((func, args, kwargs))
+
+    @property
+    def content_length(self):
+        """
+        :return: declared size of request body, None if unknown or invalid
+        """
+        value = self.headers.get('content-length')
+        # int() takes signs and spaces too, while negative length would mean reading till end of stream
+        if not value or not value.isdigit():
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            return None
+
+    def _count(self, size: int):
+        self._consumed += size
+        if self.max_content_length is not None and self._consumed > self.max_content_length:
+            from .errors import RequestEntityTooLarge
+            raise RequestEntityTooLarge
+
+    def _start_reading(self):
+        length = self.content_length
+        if length is None and self.env.get('CONTENT_LENGTH'):
+            from .errors import BadRequest
+            raise BadRequest('Invalid Content-Length header')
+
+        if length is None:
+            # without declared length input may be read only till the end of stream
+            length = -1 if self.env.get('wsgi.input_terminated') else 0
+
+        if self.max_content_length is not None and length > self.max_content_length:
+            from .errors import RequestEntityTooLarge
+            raise RequestEntityTooLarge
+
+        self._remaining = length
+
+    def _read(self, size: int) -> bytes:
+        if self._remaining is None:
+            self._start_reading()
+
+        if not self._remaining:
+            return b''
+
+        if self._remaining > 0:
+            size = min(size, self._remaining)
+
+        chunk = self.env['wsgi.input'].read(size)
+        if not chunk:
+            self._remaining = 0
+            return b''
+
+        if self._remaining > 0:
+            self._remaining -= len(chunk)
+
+        self._count(len(chunk))
+        return chunk
+
+    def iter_content(self, chunk_size: int = None):
+        """
+        Yields body of request by chunks, without keeping it in memory.
+
+        :param chunk_size: max size of single chunk, ``Request.chunk_size`` by default
+        """
+        chunk_size = chunk_size or self.chunk_size
+
+        if self._content is not None:
+            for start in range(0, len(self._content), chunk_size):
+                yield self._content[start:start + chunk_size]
+            return
+
+        while True:
+            chunk = self._read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def readinto(self, buffer) -> int:
+        """
+        Reads next part of request body into writable buffer.
+
+        :return: number of bytes read, 0 when body is exhausted
+        """
+        if self._content is not None:
+            raise RuntimeError('Request body was already read into memory')
+
+        if self._remaining is None:
+            self._start_reading()
+
+        view = memoryview(buffer).cast('B')
+        size = len(view) if self._remaining < 0 else min(len(view), self._remaining)
+        if not size:
+            return 0
+
+        stream = self.env['wsgi.input']
+        if hasattr(stream, 'readinto'):
+            read = stream.readinto(view[:size]) or 0
+        else:
+            chunk = stream.read(size)
+            read = len(chunk)
+            view[:read] = chunk
+
+        if not read:
+            self._remaining = 0
+        elif self._remaining > 0:
+            self._remaining -= read
+
+        self._count(read)
+        return read
+
     @property
     def content(self):
         """
         :return: raw byte body content of request
         """
         if self._content is None:
-            self._content = self.env['wsgi.input'].read(int(self.headers.get('content-length')) or 0)
+            if self._consumed:
+                raise RuntimeError('Request body was already consumed by streaming')
+
+            self._start_reading()
+            self._content = b''.join(self.iter_content(max(self._remaining, self.chunk_size)))
 
         return self._content
 
@@ -144,76 +501,336 @@ class Request:
 
     @property
     def json(self):
-        return json.loads(self.text)
+        app = self.env.get('app')
+        return (app.json_codec if app is not None else default_codec).loads(self.content)
 
-    @property
-    def headers(self):
-        if self._headers is None:
-            self._headers = Headers.from_wsgi_env(self.env)
-
-        return self._headers
+    @cached_property
+    def headers(self) -> EnvironHeaders:
+        return EnvironHeaders(self.env)
 
     @property
     def app(self):
         return self.env['app']
 
+    @cached_property
+    def args(self) -> MultiDict:
+        """
+        :return: url decoded query string parameters
+        """
+        return MultiDict(parse_qsl(self.env.get('QUERY_STRING', ''), keep_blank_values=True))
+
+    @cached_property
+    def _form_data(self) -> tuple:
+        from .formparser import default_parser
+        return (self.form_parser or default_parser).parse(self)
+
     @property
-    def args(self):
-        logger.debug('Querry url params: "{}"'.format(self.env['QUERY_STRING']))
-        return dict(pair.split('=') for pair in self.env['QUERY_STRING'].split('&'))
+    def form(self) -> MultiDict:
+        """
+        :return: fields of urlencoded or multipart form body
+        """
+        return self._form_data[0]
 
     @property
-    def cookies(self):
-        if self._cookies is None:
-            self._cookies = Cookies(self.env)
+    def files(self) -> MultiDict:
+        """
+        :return: ``yawf.formparser.FileStorage`` objects of multipart form body
+        """
+        return self._form_data[1]
 
-        return self._cookies
+    @cached_property
+    def path_segments(self) -> tuple:
+        return tuple(segment for segment in self.path.split('/') if segment)
+
+    @cached_property
+    def cookies(self) -> Cookies:
+        return Cookies(self.env.get('HTTP_COOKIE'))
 
 
 class Response:
+    """
+    Response with body given as string, json serializable list or dict or iterable of bytes.
+
+    Json body is serialized with application json codec, when response is sent,
+    or with given codec by ``render``.
+    """
+    __slots__ = ('response', 'status', 'tasks', '_headers', '_cookies', '_payload')
+
     default_status = 200
 
     def __init__(self, response=None, headers=None, status=default_status, cookies=None):
+        # headers are kept as plain list of pairs until Headers object is asked for
         if isinstance(headers, Headers):
-            self.headers = headers
+            self._headers = headers
+        elif isinstance(headers, dict):
+            self._headers = list(headers.items())
         else:
-            self.headers = Headers(headers)
+            self._headers = list(headers or ())
 
+        self._payload = None
         if response is None:
             self.response = []
         elif isinstance(response, str):
             self.response = [response.strip().encode() + b'\n']
-            self.headers.add('Content-Type', 'text/plain')
-            self.headers.add('Content-length', str(self.content_length))
+            self.add_header('Content-Type', 'text/plain')
+            self.add_header('Content-length', str(self.content_length))
         elif isinstance(response, (list, dict)):
-            self.response = [json.dumps(response).encode()]
-            self.headers.add('Content-Type', 'application/json')
-            self.headers.add('Content-length', str(self.content_length))
+            # serialized on render, None body marks pending payload
+            self.response = None
+            self._payload = response
+            self.add_header('Content-Type', 'application/json')
         else:
             self.response = response
 
         self.status = status
+        #: background tasks as ``(func, args, kwargs)`` tuples, see ``add_task``
+        self.tasks = None
+        self._cookies = None
+        if cookies:
+            self.cookies.update(cookies)
+
+    @property
+    def headers(self) -> Headers:
+        if not isinstance(self._headers, Headers):
+            self._headers = Headers.from_list(self._headers)
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers: Headers):
+        self._headers = headers
 
-        if isinstance(cookies, Cookies):
-            self.cookies = cookies
+    def add_header(self, name: str, val: str):
+        if isinstance(self._headers, Headers):
+            self._headers.add(name, val)
         else:
-            self.cookies = Cookies(cookies)
+            self._headers.append((name, val))
+
+    def add_task(self, func, *args, **kwargs):
+        """
+        Adds background task, that is run by ``YAWF.tasks`` after response is sent.
+        """
+        if self.tasks is None:
+            self.tasks = []
+        self.tasks.append((func, args, kwargs))
+
+    @property
+    def cookies(self) -> ResponseCookies:
+        """
+        Cookies assigned to response, each one is sent as ``Set-Cookie`` header, like with ``set_cookie``.
+        """
+        if self._cookies is None:
+            self._cookies = ResponseCookies(self)
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, cookies: dict):
+        # ``response.cookies |= other`` assigns back the same, already updated object
+        if cookies is not self._cookies:
+            self.cookies.update(cookies)
+
+    def set_cookie(self, name: str, value: str = '', max_age: int = None, expires=None, path: str = '/',
+                   domain: str = None, secure: bool = False, httponly: bool = False, samesite: str = None):
+        """
+        Adds ``Set-Cookie`` header, see ``yawf.utils.dump_cookie`` for arguments.
+        """
+        self.add_header('Set-Cookie', dump_cookie(name, value, max_age=max_age, expires=expires, path=path,
+                                                  domain=domain, secure=secure, httponly=httponly, samesite=samesite))
+
+    def delete_cookie(self, name: str, path: str = '/', domain: str = None):
+        """
+        Makes client drop cookie set with the same path and domain.
+        """
+        self.set_cookie(name, max_age=0, expires=0, path=path, domain=domain)
+
+    def render(self, codec=None):
+        """
+        Serializes pending json body.
+
+        :param codec: json codec, default one if not given
+        """
+        if self.response is None:
+            body = (codec or default_codec).dumps(self._payload)
+            self.response, self._payload = [body], None
+            self.add_header('Content-Length', str(len(body)))
 
     def make_status_str(self):
-        return '{} {}'.format(self.status, HTTP_STATUSES_STRINGS[self.status])
+        return make_status_str(self.status)
 
     def make_headers(self):
-        if self.cookies.wsgi_header:
-            return self.headers.wsgi_headers + [self.cookies.wsgi_header]
-        return self.headers.wsgi_headers
+        headers = self._headers
+        if isinstance(headers, Headers):
+            return headers.wsgi_headers
+        return headers
 
     def __call__(self, environment, start_response):
+        if self.response is None:
+            self.render(getattr(environment.get('app'), 'json_codec', None))
+
         status = self.make_status_str()
 
         start_response(status, self.make_headers())
-        logger.debug('[Response] returning data: "{}"'.format(self.response))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('[Response] returning data: "%s"', self.response)
         return self.response
 
     @property
     def content_length(self):
+        self.render()
         return sum(len(x) for x in self.response)
+
+
+def _partial_content(response: Response, environment, size: int):
+    """
+    Applies ``Range`` request header to response body of known size.
+
+    :return: tuple of status, additional headers and range of body to send or None for whole body
+    """
+    headers = [('Accept-Ranges', 'bytes')]
+    byte_range = None
+
+    if response.status == 200 and environment.get('REQUEST_METHOD') in ('GET', 'HEAD'):
+        try:
+            byte_range = parse_range(environment.get('HTTP_RANGE'), size)
+        except ValueError:
+            headers += [('Content-Range', 'bytes */{}'.format(size)), ('Content-Length', '0')]
+            return 416, headers, (0, 0)
+
+    if byte_range is None:
+        headers.append(('Content-Length', str(size)))
+        return response.status, headers, None
+
+    start, stop = byte_range
+    headers += [('Content-Range', 'bytes {}-{}/{}'.format(start, stop - 1, size)),
+                ('Content-Length', str(stop - start))]
+    return 206, headers, byte_range
+
+
+def _slice_iter(iterable, start: int, stop: int):
+    """
+    Yields bytes from ``start`` till ``stop`` positions of chunked body.
+    """
+    pos = 0
+    try:
+        for chunk in iterable:
+            end = pos + len(chunk)
+            if end > start:
+                yield chunk[max(start - pos, 0):stop - pos]
+            pos = end
+            if pos >= stop:
+                break
+    finally:
+        close = getattr(iterable, 'close', None)
+        if close is not None:
+            close()
+
+
+class StreamingResponse(Response):
+    """
+    Response with body produced by iterable of bytes chunks.
+
+    Body size is not known unless ``content_length`` is given, so Content-Length header is omitted
+    and server sends body with chunked transfer encoding. With known size ranges are supported.
+    """
+    __slots__ = ('length',)
+
+    def __init__(self, response, headers=None, status=Response.default_status, cookies=None,
+                 content_type='application/octet-stream', content_length: int = None):
+        Response.__init__(self, None, headers=headers, status=status, cookies=cookies)
+        self.response = response
+        self.length = content_length
+        if 'content-type' not in self.headers:
+            self.headers.add('Content-Type', content_type)
+
+    def __call__(self, environment, start_response):
+        if self.length is None:
+            start_response(self.make_status_str(), self.make_headers())
+            return self.response
+
+        status, headers, byte_range = _partial_content(self, environment, self.length)
+        start_response(make_status_str(status), self.make_headers() + headers)
+
+        if byte_range is None:
+            return self.response
+
+        return _slice_iter(self.response, *byte_range)
+
+
+class FileIterator:
+    """
+    Reads file by chunks of fixed size, up to given number of bytes.
+    """
+    __slots__ = ('file', 'chunk_size', 'remaining')
+
+    def __init__(self, file, chunk_size: int, length: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.remaining = length
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.remaining <= 0:
+            raise StopIteration
+
+        chunk = self.file.read(min(self.chunk_size, self.remaining))
+        if not chunk:
+            raise StopIteration
+
+        self.remaining -= len(chunk)
+        return chunk
+
+    def close(self):
+        self.file.close()
+
+
+class FileResponse(Response):
+    """
+    Response sending file from disk.
+
+    Whole file is given to ``wsgi.file_wrapper`` when server provides it, so server can send it
+    with zero copy ``sendfile``; otherwise and for ranges file is read by chunks of fixed size.
+    """
+    __slots__ = ('file', 'chunk_size')
+
+    def __init__(self, file, headers=None, status=Response.default_status, cookies=None,
+                 content_type: str = None, chunk_size: int = 64 * 1024):
+        """
+        :param file: path to file or file object opened in binary mode
+        """
+        Response.__init__(self, None, headers=headers, status=status, cookies=cookies)
+        self.file = file
+        self.chunk_size = chunk_size
+
+        if content_type is None and isinstance(file, str):
+            content_type = mimetypes.guess_type(file)[0]
+
+        if 'content-type' not in self.headers:
+            self.headers.add('Content-Type', content_type or 'application/octet-stream')
+
+    def open(self):
+        if isinstance(self.file, str):
+            return open(self.file, 'rb')
+        return self.file
+
+    def __call__(self, environment, start_response):
+        file = self.open()
+        try:
+            size = os.fstat(file.fileno()).st_size - file.tell()
+        except (AttributeError, OSError):
+            position = file.tell()
+            size = file.seek(0, os.SEEK_END) - position
+            file.seek(position)
+
+        status, headers, byte_range = _partial_content(self, environment, size)
+        start_response(make_status_str(status), self.make_headers() + headers)
+
+        if byte_range is None:
+            file_wrapper = environment.get('wsgi.file_wrapper')
+            if file_wrapper is not None:
+                return file_wrapper(file, self.chunk_size)
+            return FileIterator(file, self.chunk_size, size)
+
+        start, stop = byte_range
+        file.seek(start, os.SEEK_CUR)
+        return FileIterator(file, self.chunk_size, stop - start)